@@ -0,0 +1,161 @@
+"""
+Two-tier cache: an in-process LRU in front of an optional SQLite store.
+
+Entries are JSON-serialised on disk so they survive restarts and can be shared
+between uvicorn workers on the same host.
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional
+from dotenv import load_dotenv
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = Path(os.environ.get('CACHE_DIR', str(ROOT_DIR / '.cache')))
+
+
+def normalize_key(text: str) -> str:
+    """Normalize free text (locations, keywords) into a stable cache key."""
+    text = text.lower().strip()
+    text = re.sub(r'\s*,\s*', ', ', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip(' ,.')
+
+
+class CacheEntry(NamedTuple):
+    value: Any
+    stored_at: float
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+
+class TieredCache:
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = 1024,
+        ttl_seconds: float = 86400,
+        db_path: Optional[Path] = None,
+        retention_seconds: Optional[float] = None
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # How long expired rows are kept on disk (callers may still read them stale)
+        self.retention_seconds = max(ttl_seconds, retention_seconds or 0)
+        self.db_path = db_path
+        self._memory: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "evictions": 0
+        }
+        if db_path is not None:
+            self._open_db(db_path)
+
+    def _open_db(self, db_path: Path) -> None:
+        try:
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(db_path), check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)"
+            )
+            self._db.execute("DELETE FROM cache WHERE stored_at < ?", (time.time() - self.retention_seconds,))
+        except Exception as e:
+            logger.warning(f"Disk cache '{self.name}' unavailable, using memory only: {e}")
+            self._db = None
+
+    def get_entry(self, key: str, max_age: Optional[float] = None) -> Optional[CacheEntry]:
+        """Return the entry for key if it is younger than max_age (defaults to the TTL)."""
+        max_age = self.ttl_seconds if max_age is None else max_age
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry.age <= max_age:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return entry
+
+            entry = self._read_disk(key)
+            if entry is not None and entry.age <= max_age:
+                self._remember(key, entry)
+                self._counters["disk_hits"] += 1
+                return entry
+
+            self._counters["misses"] += 1
+            return None
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self.get_entry(key)
+        return entry.value if entry is not None else None
+
+    def set(self, key: str, value: Any) -> None:
+        entry = CacheEntry(value, time.time())
+        with self._lock:
+            self._remember(key, entry)
+            self._counters["sets"] += 1
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO cache (key, value, stored_at) VALUES (?, ?, ?)",
+                        (key, json.dumps(value), entry.stored_at)
+                    )
+                except Exception as e:
+                    logger.warning(f"Disk cache '{self.name}' write failed: {e}")
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._memory.pop(key, None)
+            if self._db is not None:
+                self._db.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._counters["memory_hits"] + self._counters["disk_hits"] + self._counters["misses"]
+            hits = lookups - self._counters["misses"]
+            return {
+                **self._counters,
+                "size": len(self._memory),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "persistent": self._db is not None,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0
+            }
+
+    def _remember(self, key: str, entry: CacheEntry) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def _read_disk(self, key: str) -> Optional[CacheEntry]:
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute(
+                "SELECT value, stored_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        except Exception as e:
+            logger.warning(f"Disk cache '{self.name}' read failed: {e}")
+            return None
+        if row is None:
+            return None
+        return CacheEntry(json.loads(row[0]), row[1])
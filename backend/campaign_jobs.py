@@ -0,0 +1,357 @@
+"""
+Background lead campaigns: locations x industries searches too large for one
+HTTP request.
+
+Jobs are queued in-process and run by a small worker pool. Job state, the
+(location, industry) searches already done and the leads found are persisted
+in SQLite, so queued and running jobs resume where they stopped after a restart.
+"""
+
+import os
+import json
+import time
+import uuid
+import asyncio
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+from dotenv import load_dotenv
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+from cache_store import CACHE_DIR
+from places_service import places_service
+from lead_service import lead_service
+from lead_dedupe import LeadIndex
+
+logger = logging.getLogger(__name__)
+
+CAMPAIGN_JOB_DB_PATH = os.environ.get('CAMPAIGN_JOB_DB_PATH', str(CACHE_DIR / 'campaign_jobs.sqlite3'))
+CAMPAIGN_JOB_WORKERS = int(os.environ.get('CAMPAIGN_JOB_WORKERS', '2'))
+
+ACTIVE_STATUSES = ("queued", "running")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    request TEXT NOT NULL,
+    total_searches INTEGER NOT NULL,
+    done_searches INTEGER NOT NULL DEFAULT 0,
+    failed_searches INTEGER NOT NULL DEFAULT 0,
+    leads INTEGER NOT NULL DEFAULT 0,
+    active_seconds REAL NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS job_searches (
+    job_id TEXT NOT NULL,
+    location TEXT NOT NULL,
+    industry TEXT NOT NULL,
+    PRIMARY KEY (job_id, location, industry)
+);
+CREATE TABLE IF NOT EXISTS job_leads (
+    job_id TEXT NOT NULL,
+    lead_key TEXT NOT NULL,
+    matches INTEGER NOT NULL,
+    distance_km REAL NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (job_id, lead_key)
+);
+CREATE INDEX IF NOT EXISTS job_leads_rank ON job_leads (job_id, matches DESC, distance_km);
+"""
+
+
+def _lead_key(lead: Dict[str, Any]) -> str:
+    return lead["place_id"] or f"{lead['name']}|{lead['latitude']}|{lead['longitude']}"
+
+
+class CampaignJobStore:
+    def __init__(self, db_path: Path):
+        self._lock = threading.Lock()
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(db_path), check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+
+    def create(self, request: Dict[str, Any], total_searches: int) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, status, request, total_searches, created_at, updated_at) VALUES (?, 'queued', ?, ?, ?, ?)",
+                (job_id, json.dumps(request), total_searches, now, now)
+            )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def active_job_ids(self) -> List[str]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at", ACTIVE_STATUSES
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+    def set_status(self, job_id: str, status: str, error: Optional[str] = None) -> None:
+        now = time.time()
+        finished_at = None if status in ACTIVE_STATUSES else now
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ?, finished_at = ? WHERE id = ?",
+                (status, error, now, finished_at, job_id)
+            )
+
+    def done_searches(self, job_id: str) -> set:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT location, industry FROM job_searches WHERE job_id = ?", (job_id,)
+            ).fetchall()
+        return {(row["location"], row["industry"]) for row in rows}
+
+    def known_leads(self, job_id: str) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT lead_key, data FROM job_leads WHERE job_id = ?", (job_id,)
+            ).fetchall()
+        return {row["lead_key"]: json.loads(row["data"]) for row in rows}
+
+    def record_step(
+        self,
+        job_id: str,
+        searches: List[tuple],
+        failed: int,
+        leads: Dict[str, Dict[str, Any]],
+        new_leads: int,
+        seconds: float
+    ) -> None:
+        """Persist one step: searches done, leads added or updated and counters."""
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO job_searches (job_id, location, industry) VALUES (?, ?, ?)",
+                    [(job_id, location, industry) for location, industry in searches]
+                )
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO job_leads (job_id, lead_key, matches, distance_km, data) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (job_id, key, len(lead["matched_industries"]), lead["distance_km"], json.dumps(lead))
+                        for key, lead in leads.items()
+                    ]
+                )
+                self._db.execute(
+                    "UPDATE jobs SET done_searches = done_searches + ?, failed_searches = failed_searches + ?, "
+                    "leads = leads + ?, active_seconds = active_seconds + ?, updated_at = ? WHERE id = ?",
+                    (len(searches), failed, new_leads, seconds, time.time(), job_id)
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def results(self, job_id: str, offset: int, limit: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT data FROM job_leads WHERE job_id = ? ORDER BY matches DESC, distance_km LIMIT ? OFFSET ?",
+                (job_id, limit, offset)
+            ).fetchall()
+        return [json.loads(row["data"]) for row in rows]
+
+    def result_batches(self, job_id: str, batch_size: int = 500) -> Iterator[List[Dict[str, Any]]]:
+        """All results in rank order, one page at a time."""
+        offset = 0
+        while True:
+            batch = self.results(job_id, offset, batch_size)
+            if not batch:
+                return
+            yield batch
+            offset += len(batch)
+
+
+class CampaignJobQueue:
+    def __init__(self, db_path: str, workers: int):
+        self.store = CampaignJobStore(Path(db_path))
+        self.workers = max(1, workers)
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+
+    async def startup(self) -> None:
+        """Start the worker pool and requeue jobs left queued or running by a previous process."""
+        self._queue = asyncio.Queue()
+        resumed = self.store.active_job_ids()
+        for job_id in resumed:
+            self.store.set_status(job_id, "queued")
+            self._queue.put_nowait(job_id)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info(f"Campaign job workers started: {self.workers} ({len(resumed)} jobs resumed)")
+
+    async def shutdown(self) -> None:
+        # Interrupted jobs stay queued/running in the store and resume on next start
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, request: Dict[str, Any]) -> str:
+        total = len(request["user_locations"]) * len(request["target_industries"])
+        job_id = self.store.create(request, total)
+        self._queue.put_nowait(job_id)
+        return job_id
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job; False if it already finished."""
+        job = self.store.get(job_id)
+        if job is None or job["status"] not in ACTIVE_STATUSES:
+            return False
+        self.store.set_status(job_id, "cancelled")
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+        return True
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self.store.get(job_id)
+        if job is None:
+            return None
+        active_seconds = job["active_seconds"]
+        return {
+            "job_id": job["id"],
+            "status": job["status"],
+            "total_searches": job["total_searches"],
+            "done_searches": job["done_searches"],
+            "failed_searches": job["failed_searches"],
+            "leads": job["leads"],
+            "leads_per_second": round(job["leads"] / active_seconds, 2) if active_seconds > 0 else 0.0,
+            "active_seconds": round(active_seconds, 2),
+            "error": job["error"],
+            "created_at": job["created_at"],
+            "updated_at": job["updated_at"],
+            "finished_at": job["finished_at"]
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._workers),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "running": len(self._running)
+        }
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                job = self.store.get(job_id)
+                if job is None or job["status"] not in ACTIVE_STATUSES:
+                    continue
+                task = asyncio.create_task(self._run(job_id, json.loads(job["request"])))
+                self._running[job_id] = task
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    # Either this job was cancelled or the worker is shutting down
+                    if not task.cancelled():
+                        raise
+                    if self.store.get(job_id)["status"] != "cancelled":
+                        raise
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Campaign job {job_id} failed: {str(e)}")
+                self.store.set_status(job_id, "failed", str(e))
+            finally:
+                self._running.pop(job_id, None)
+                self._queue.task_done()
+
+    async def _run(self, job_id: str, request: Dict[str, Any]) -> None:
+        self.store.set_status(job_id, "running")
+        logger.info(f"Campaign job {job_id} running")
+        done = self.store.done_searches(job_id)
+        index = LeadIndex()
+        for lead in self.store.known_leads(job_id).values():
+            index.add(lead)
+        industries = request["target_industries"]
+        geocoded = await places_service.geocode_many(request["user_locations"])
+
+        # One step per location: its remaining industries are searched concurrently
+        for location, coordinates in geocoded.items():
+            started = time.time()
+            pending = [industry for industry in industries if (location, industry) not in done]
+            if not pending:
+                continue
+            if not coordinates:
+                self.store.record_step(job_id, [(location, i) for i in pending], len(pending), {}, 0, time.time() - started)
+                continue
+
+            results = await places_service.search_batch(
+                [(coordinates["latitude"], coordinates["longitude"])],
+                pending,
+                radius=request["search_radius_km"] * 1000,
+                max_results=request["max_leads_per_search"],
+                coverage=request["coverage_mode"]
+            )
+            country_code = coordinates.get("country_code")
+            failed = 0
+            changed: Dict[str, Dict[str, Any]] = {}
+            fresh: List[Dict[str, Any]] = []
+            for industry, places in zip(pending, results[0]):
+                if isinstance(places, Exception):
+                    failed += 1
+                    logger.warning(f"Campaign job {job_id}: search failed for {industry} near {location}: {places}")
+                    continue
+                for lead in places_service.format_places_for_leads(
+                    places,
+                    coordinates["latitude"],
+                    coordinates["longitude"],
+                    radius_km=request["search_radius_km"],
+                    limit=request["max_leads_per_search"],
+                    require_phone=request["require_phone"],
+                    operational_only=request["operational_only"]
+                ):
+                    lead = {**lead, "location": location, "matched_industries": [industry]}
+                    if len(index.leads) >= request["max_leads"] and index.find(lead, country_code) is None:
+                        continue
+                    kept, is_new = index.add(lead, country_code)
+                    if is_new:
+                        fresh.append(kept)
+                    else:
+                        # Already known: the merge may add an industry or a nearer location
+                        changed[_lead_key(kept)] = kept
+
+            pitched = await lead_service.process_leads(
+                fresh,
+                request["user_business_name"],
+                request["user_core_offering"],
+                request["use_ai_pitch"],
+                request["pitch_language"],
+                country_code
+            )
+            for lead, pitched_lead in zip(fresh, pitched):
+                lead.update(pitched_lead)
+                changed[_lead_key(lead)] = lead
+
+            self.store.record_step(
+                job_id,
+                [(location, industry) for industry in pending],
+                failed,
+                changed,
+                len(fresh),
+                time.time() - started
+            )
+            done.update((location, industry) for industry in pending)
+
+        self.store.set_status(job_id, "completed")
+        logger.info(f"Campaign job {job_id} completed with {len(index.leads)} leads ({index.duplicates} duplicates merged)")
+
+
+campaign_job_queue = CampaignJobQueue(CAMPAIGN_JOB_DB_PATH, CAMPAIGN_JOB_WORKERS)
@@ -0,0 +1,332 @@
+"""
+PDF / DOCX text extraction in a bounded process pool.
+
+Extraction is CPU-bound (pdfplumber especially), so it runs in worker
+processes that import the parsers once at startup instead of on the event
+loop. Jobs past the pending limit are rejected with 503 rather than queued
+without bound, and each job has a timeout. PDFs are read page by page, with
+long ones split into page ranges across the workers.
+"""
+
+import io
+import os
+import math
+import mmap
+import time
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import ExitStack, contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from dotenv import load_dotenv
+from pathlib import Path
+from fastapi import HTTPException
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+logger = logging.getLogger(__name__)
+
+DOC_EXTRACT_WORKERS = int(os.environ.get('DOC_EXTRACT_WORKERS', str(min(2, os.cpu_count() or 1))))
+DOC_EXTRACT_MAX_PENDING = int(os.environ.get('DOC_EXTRACT_MAX_PENDING', str(DOC_EXTRACT_WORKERS * 4)))
+DOC_EXTRACT_TIMEOUT_SECONDS = float(os.environ.get('DOC_EXTRACT_TIMEOUT_SECONDS', '30'))
+# Spooled PDFs longer than this are split into page ranges across the workers;
+# each range re-opens the document, so ranges are never shorter than this
+PDF_MIN_PAGES_PER_CHUNK = max(1, int(os.environ.get('PDF_MIN_PAGES_PER_CHUNK', '32')))
+# Fast mode stops once this much text is found (enough for ATS analysis of a resume)
+PDF_FAST_MODE_CHARS = int(os.environ.get('PDF_FAST_MODE_CHARS', '6000'))
+
+
+class DocumentExtractionError(Exception):
+    """Raised in workers for files we cannot read; the message is shown to the user."""
+
+
+# Worker side (runs in the pool processes)
+
+def _warm_worker() -> None:
+    # Import the parsers once per worker so the first job doesn't pay for it
+    import PyPDF2  # noqa: F401
+    import pdfplumber  # noqa: F401
+    import docx  # noqa: F401
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+@contextmanager
+def _open_source(source: Union[bytes, str]) -> Iterator[Any]:
+    """A seekable binary stream over in-memory bytes or a memory-mapped file."""
+    if isinstance(source, bytes):
+        yield io.BytesIO(source)
+        return
+    with open(source, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        yield mapped
+
+
+def extract_pdf_pages(source: Union[bytes, str], start: int = 0, end: Optional[int] = None, min_chars: int = 0) -> Dict[str, Any]:
+    """
+    Extract pages [start, end) (to the last page when end is None) of a PDF (bytes or path) with PyPDF2, re-reading
+    only the pages that came back empty with pdfplumber. With min_chars set,
+    stops once that much text has been found. Returns the document's page count
+    and one (index, text, method, seconds) entry per page read.
+    """
+    from PyPDF2 import PdfReader
+    import pdfplumber
+
+    with ExitStack() as stack:
+        reader = None
+        try:
+            reader = PdfReader(stack.enter_context(_open_source(source)))
+            page_count = len(reader.pages)
+        except Exception as e:
+            logger.warning(f"PyPDF2 could not open PDF: {e}")
+
+        plumber = None
+
+        def plumber_pdf() -> Any:
+            # Opened on its own stream, and only once some page needs it
+            nonlocal plumber
+            if plumber is None:
+                plumber = stack.enter_context(pdfplumber.open(stack.enter_context(_open_source(source))))
+            return plumber
+
+        if reader is None:
+            try:
+                page_count = len(plumber_pdf().pages)
+            except Exception as e:
+                logger.warning(f"pdfplumber could not open PDF: {e}")
+                raise DocumentExtractionError("Could not extract text from PDF. The file may be image-based or corrupted. Please try pasting your resume text instead.")
+
+        pages = []
+        chars = 0
+        for index in range(start, page_count if end is None else min(end, page_count)):
+            started = time.perf_counter()
+            text, method = "", "pypdf2"
+            if reader is not None:
+                try:
+                    text = reader.pages[index].extract_text() or ""
+                except Exception as e:
+                    logger.warning(f"PyPDF2 failed on page {index + 1}: {e}")
+            if not text.strip():
+                method = "pdfplumber"
+                try:
+                    text = plumber_pdf().pages[index].extract_text() or ""
+                except Exception as e:
+                    logger.warning(f"pdfplumber failed on page {index + 1}: {e}")
+            text = text.strip()
+            pages.append((index, text, method, time.perf_counter() - started))
+            chars += len(text)
+            if min_chars and chars >= min_chars:
+                break
+
+    return {"page_count": page_count, "pages": pages}
+
+
+def extract_docx_text(source: Union[bytes, str]) -> str:
+    """Extract text from DOCX file (bytes or path)"""
+    try:
+        from docx import Document
+        # A path is read through zipfile's random access, member by member
+        doc = Document(io.BytesIO(source) if isinstance(source, bytes) else source)
+
+        # Extract text from paragraphs
+        paragraphs = [para.text for para in doc.paragraphs if para.text.strip()]
+
+        # Also extract text from tables
+        for table in doc.tables:
+            for row in table.rows:
+                for cell in row.cells:
+                    if cell.text.strip():
+                        paragraphs.append(cell.text.strip())
+
+        text = "\n".join(paragraphs)
+        if not text:
+            logger.warning("DOCX extraction returned empty text")
+        return text.strip()
+    except Exception as e:
+        logger.error(f"DOCX extraction error: {e}", exc_info=True)
+        raise DocumentExtractionError(f"Failed to extract text from DOCX: {str(e)}")
+
+
+# Parent side
+
+class DocumentExtractor:
+    def __init__(self, workers: int, max_pending: int, timeout_seconds: float):
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.timeout_seconds = timeout_seconds
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self.counters = {"completed": 0, "failed": 0, "timeouts": 0, "rejected": 0, "pages": 0, "seconds": 0.0}
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_worker
+        )
+
+    async def startup(self) -> None:
+        """Start the pool and spawn every worker now rather than on the first upload."""
+        self._pool = self._new_pool()
+        loop = asyncio.get_running_loop()
+        try:
+            pids = await asyncio.gather(*[loop.run_in_executor(self._pool, _ping) for _ in range(self.workers)])
+            logger.info(f"Document extraction pool started: {len(set(pids))} workers")
+        except Exception as e:
+            logger.error(f"Document extraction pool failed to start, extracting in threads: {e}")
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        if self._threads is not None:
+            self._threads.shutdown(wait=False, cancel_futures=True)
+            self._threads = None
+
+    def _executor(self) -> Executor:
+        if self._pool is not None:
+            return self._pool
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="extract")
+        return self._threads
+
+    def _release(self, _future: Any = None) -> None:
+        self._pending -= 1
+
+    def _release_when_done(self, jobs: List[Future]) -> None:
+        """
+        Free a document's pending slot. Its jobs that have not started are
+        cancelled; the slot is held until the ones already running finish.
+        """
+        for job in jobs:
+            job.cancel()
+        running = [job for job in jobs if not job.done()]
+        if not running:
+            self._release()
+            return
+        waiter = asyncio.gather(*[asyncio.wrap_future(job) for job in running], return_exceptions=True)
+        waiter.add_done_callback(self._release)
+
+    async def _run(self, jobs: List[Future], fn: Callable[..., Any], *args: Any) -> Any:
+        """Run fn in the pool as one of a document's jobs."""
+        job = self._executor().submit(fn, *args)
+        jobs.append(job)
+        return await asyncio.wrap_future(job)
+
+    def _page_ranges(self, start: int, page_count: int) -> List[Tuple[int, int]]:
+        """Split pages [start, page_count) into at most one range per worker."""
+        remaining = page_count - start
+        if remaining <= 0:
+            return []
+        size = max(PDF_MIN_PAGES_PER_CHUNK, math.ceil(remaining / self.workers))
+        return [(first, min(first + size, page_count)) for first in range(start, page_count, size)]
+
+    async def _extract_pdf(self, jobs: List[Future], source: Union[bytes, str], fast: bool) -> str:
+        """
+        In-memory uploads are small and read in one pass. A spooled file is
+        read by path: the first range also reports the page count, and the
+        rest of a long document is split into one range per worker, run in
+        parallel (or one at a time in fast mode, stopping as soon as there is
+        enough text).
+        """
+        started = time.monotonic()
+        min_chars = PDF_FAST_MODE_CHARS if fast else 0
+        first_end = None if isinstance(source, bytes) else PDF_MIN_PAGES_PER_CHUNK
+        chunks = [await self._run(jobs, extract_pdf_pages, source, 0, first_end, min_chars)]
+        page_count = chunks[0]["page_count"]
+        ranges = [] if first_end is None else self._page_ranges(first_end, page_count)
+        if fast:
+            chars = sum(len(text) for _, text, _, _ in chunks[0]["pages"])
+            for start, end in ranges:
+                if chars >= min_chars:
+                    break
+                chunk = await self._run(jobs, extract_pdf_pages, source, start, end, min_chars - chars)
+                chars += sum(len(text) for _, text, _, _ in chunk["pages"])
+                chunks.append(chunk)
+        elif ranges:
+            chunks += await asyncio.gather(*[self._run(jobs, extract_pdf_pages, source, start, end) for start, end in ranges])
+
+        pages = [page for chunk in chunks for page in chunk["pages"]]
+        self.counters["pages"] += len(pages)
+        timings = ", ".join(f"{index + 1}:{method} {seconds * 1000:.0f}ms" for index, _, method, seconds in pages)
+        logger.info(
+            f"PDF extracted {len(pages)}/{page_count} pages in {len(chunks)} chunks, "
+            f"{time.monotonic() - started:.2f}s{' (fast mode)' if fast else ''}: {timings}"
+        )
+
+        text = "\n".join(text for _, text, _, _ in pages if text)
+        if not text:
+            logger.error("Could not extract text from PDF with any method")
+            raise DocumentExtractionError("Could not extract text from PDF. The file may be image-based or corrupted. Please try pasting your resume text instead.")
+        return text
+
+    async def extract(self, kind: str, source: Union[bytes, str], fast: bool = False) -> str:
+        """
+        Extract text from a "pdf" or "docx" file given as bytes or a file path;
+        raises HTTPException on failure. fast stops reading a PDF once
+        PDF_FAST_MODE_CHARS of text have been found.
+        """
+        if self._pending >= self.max_pending:
+            self.counters["rejected"] += 1
+            raise HTTPException(status_code=503, detail="Too many documents are being processed. Please try again in a moment.")
+
+        # One slot per document, however many page ranges it is split into
+        started = time.monotonic()
+        self._pending += 1
+        jobs: List[Future] = []
+        if kind == "pdf":
+            extraction = self._extract_pdf(jobs, source, fast)
+        else:
+            extraction = self._run(jobs, extract_docx_text, source)
+
+        try:
+            text = await asyncio.wait_for(extraction, timeout=self.timeout_seconds)
+        except asyncio.TimeoutError:
+            self.counters["timeouts"] += 1
+            logger.error(f"{kind.upper()} extraction timed out after {self.timeout_seconds}s")
+            raise HTTPException(status_code=504, detail="Reading the file took too long. Please try a smaller file or paste your resume text instead.")
+        except DocumentExtractionError as e:
+            self.counters["failed"] += 1
+            raise HTTPException(status_code=400, detail=str(e))
+        except BrokenProcessPool as e:
+            # A worker died (e.g. out of memory); replace the pool for later jobs
+            self.counters["failed"] += 1
+            logger.error(f"Document extraction pool broke, restarting it: {e}")
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = self._new_pool()
+            raise HTTPException(status_code=500, detail="Failed to parse file. Please try again.")
+        except Exception as e:
+            self.counters["failed"] += 1
+            logger.error(f"{kind.upper()} extraction error: {e}")
+            raise HTTPException(status_code=500, detail=f"Failed to parse file: {str(e)}")
+        finally:
+            # On a timeout or an abandoned request, queued page ranges never start
+            self._release_when_done(jobs)
+
+        self.counters["completed"] += 1
+        self.counters["seconds"] += time.monotonic() - started
+        return text
+
+    def stats(self) -> Dict[str, Any]:
+        completed = self.counters["completed"]
+        return {
+            "mode": "process" if self._pool is not None else "thread",
+            "workers": self.workers,
+            "in_flight": self._pending,
+            "queue_depth": max(0, self._pending - self.workers),
+            "max_pending": self.max_pending,
+            "timeout_seconds": self.timeout_seconds,
+            **{key: value for key, value in self.counters.items() if key != "seconds"},
+            "avg_seconds": round(self.counters["seconds"] / completed, 3) if completed else 0.0
+        }
+
+
+document_extractor = DocumentExtractor(DOC_EXTRACT_WORKERS, DOC_EXTRACT_MAX_PENDING, DOC_EXTRACT_TIMEOUT_SECONDS)
@@ -0,0 +1,162 @@
+"""
+Small geospatial helpers shared by the lead services.
+"""
+
+import math
+from typing import List, Tuple
+
+# Same sphere as the haversine lead distances, so boxes and distances agree
+EARTH_RADIUS_M = 6371000.0
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180.0
+# Lead distances are rounded to 10 m, so a place up to 5 m past a radius still
+# counts as inside it; radius boxes are padded by that much
+DISTANCE_ROUNDING_PAD_M = 5.0
+
+_GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def encode_geohash(latitude: float, longitude: float, precision: int = 6) -> str:
+    """Encode a coordinate as a geohash string of the given length."""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(chars) < precision:
+        if even:
+            mid = (lng_range[0] + lng_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lng_range[0] = mid
+            else:
+                bits <<= 1
+                lng_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_GEOHASH_BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(chars)
+
+
+def decode_geohash(geohash: str) -> Tuple[float, float]:
+    """Return the (latitude, longitude) center of a geohash cell."""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    even = True
+
+    for char in geohash:
+        value = _GEOHASH_BASE32.index(char)
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            target = lng_range if even else lat_range
+            mid = (target[0] + target[1]) / 2
+            if bit:
+                target[0] = mid
+            else:
+                target[1] = mid
+            even = not even
+
+    return (lat_range[0] + lat_range[1]) / 2, (lng_range[0] + lng_range[1]) / 2
+
+
+def geohash_error_m(precision: int) -> float:
+    """Upper bound (meters) on the distance from any point to its geohash cell center."""
+    lat_bits = (5 * precision) // 2
+    lng_bits = 5 * precision - lat_bits
+    half_height = (180.0 / (1 << lat_bits)) / 2 * METERS_PER_DEGREE
+    half_width = (360.0 / (1 << lng_bits)) / 2 * METERS_PER_DEGREE
+    return math.hypot(half_height, half_width)
+
+
+def offset_coordinates(latitude: float, longitude: float, dx_m: float, dy_m: float) -> Tuple[float, float]:
+    """Shift a coordinate by dx (east) / dy (north) meters (equirectangular approximation)."""
+    new_lat = latitude + dy_m / METERS_PER_DEGREE
+    cos_lat = max(math.cos(math.radians(latitude)), 1e-6)
+    new_lng = longitude + dx_m / (METERS_PER_DEGREE * cos_lat)
+    return new_lat, new_lng
+
+
+def hex_tile_centers(
+    latitude: float,
+    longitude: float,
+    radius_m: float,
+    tile_radius_m: float
+) -> List[Tuple[float, float]]:
+    """
+    Centers of a pointy-top hexagonal tiling (circumradius tile_radius_m) that
+    covers the circle of radius_m around the given point, nearest first.
+    """
+    if radius_m <= tile_radius_m:
+        return [(latitude, longitude)]
+
+    limit = radius_m + tile_radius_m
+    span = int(math.ceil(limit / (1.5 * tile_radius_m))) + 1
+    tiles = []
+    for r in range(-span, span + 1):
+        for q in range(-span * 2, span * 2 + 1):
+            x = tile_radius_m * math.sqrt(3) * (q + r / 2)
+            y = tile_radius_m * 1.5 * r
+            distance = math.hypot(x, y)
+            if distance <= limit:
+                tiles.append((distance, offset_coordinates(latitude, longitude, x, y)))
+
+    tiles.sort(key=lambda tile: tile[0])
+    return [center for _, center in tiles]
+
+
+def radius_box(latitude: float, radius_m: float) -> Tuple[float, float]:
+    """
+    Half-height and half-width (degrees) of the lat/lng box enclosing a circle
+    on the sphere (padded for distance rounding); the width is 180 when the
+    circle reaches a pole.
+    """
+    angular = (radius_m + DISTANCE_ROUNDING_PAD_M) / EARTH_RADIUS_M
+    delta_lat = math.degrees(angular)
+    cos_lat = math.cos(math.radians(latitude))
+    if angular < math.pi / 2 and cos_lat > math.sin(angular):
+        return delta_lat, math.degrees(math.asin(math.sin(angular) / cos_lat))
+    return delta_lat, 180.0
+
+
+def geohash_cover(latitude: float, longitude: float, radius_m: float, max_cells: int = 16) -> List[str]:
+    """
+    Geohash prefixes whose cells cover the bounding box of the circle, using the
+    longest prefix that needs at most max_cells cells.
+    """
+    delta_lat, delta_lng = radius_box(latitude, radius_m)
+
+    for precision in range(9, 0, -1):
+        lat_bits = (5 * precision) // 2
+        lng_bits = 5 * precision - lat_bits
+        cell_height = 180.0 / (1 << lat_bits)
+        cell_width = 360.0 / (1 << lng_bits)
+        rows = int(math.ceil(2 * delta_lat / cell_height)) + 1
+        cols = int(math.ceil(2 * delta_lng / cell_width)) + 1
+        if rows * cols <= max_cells or precision == 1:
+            break
+
+    south = max(latitude - delta_lat, -90.0)
+    north = min(latitude + delta_lat, 90.0)
+    west = longitude - delta_lng
+    east = longitude + delta_lng
+    cells = set()
+    for row in range(rows + 1):
+        lat = min(south + row * cell_height, north)
+        for col in range(cols + 1):
+            lng = min(west + col * cell_width, east)
+            wrapped_lng = (lng + 180.0) % 360.0 - 180.0
+            cells.add(encode_geohash(lat, wrapped_lng, precision))
+    return sorted(cells)
@@ -0,0 +1,92 @@
+"""
+Entity resolution for leads found by several searches.
+
+The same business often comes back under different keywords with a slightly
+different name. Leads are resolved to one entity when they share a Places id,
+a normalized phone number, or a normalized name within the same ~150 m
+geohash cell; each lead costs a few hash lookups.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from geo_utils import encode_geohash
+from phone_normalizer import DEFAULT_PHONE_COUNTRY, normalize_phone
+
+
+# Geohash length for the name key: 7 characters is a ~150 m cell
+NAME_GEOHASH_PRECISION = 7
+
+_NAME_NOISE = re.compile(r'[^a-z0-9 ]+')
+_NAME_STOPWORDS = {"the", "and", "pvt", "private", "ltd", "limited", "llp", "inc", "co", "company"}
+
+
+def normalize_business_name(name: str) -> str:
+    """Lowercase, drop punctuation and legal/filler words: "The Glam Salon Pvt. Ltd." -> "glam salon"."""
+    words = _NAME_NOISE.sub(' ', (name or "").lower().replace("&", " and ")).split()
+    return " ".join(word for word in words if word not in _NAME_STOPWORDS)
+
+
+def merge_lead(primary: Dict[str, Any], duplicate: Dict[str, Any]) -> None:
+    """Fold a duplicate into the lead kept for the entity."""
+    for field in ("phone", "address"):
+        if not primary.get(field) and duplicate.get(field):
+            primary[field] = duplicate[field]
+    if duplicate.get("distance_km", float("inf")) < primary.get("distance_km", float("inf")):
+        primary["distance_km"] = duplicate["distance_km"]
+        if "location" in duplicate:
+            primary["location"] = duplicate["location"]
+    if "matched_industries" in duplicate:
+        industries = primary.setdefault("matched_industries", [])
+        for industry in duplicate["matched_industries"]:
+            if industry not in industries:
+                industries.append(industry)
+
+
+class LeadIndex:
+    """
+    Incremental index over formatted leads (format_places_for_leads output).
+
+    The first lead seen for an entity is kept; later matches are merged into it.
+    """
+
+    def __init__(self, country_code: Optional[str] = None):
+        self.country_code = country_code or DEFAULT_PHONE_COUNTRY
+        self.leads: List[Dict[str, Any]] = []
+        self.duplicates = 0
+        self._entities: Dict[str, Dict[str, Any]] = {}
+
+    def keys(self, lead: Dict[str, Any], country_code: Optional[str] = None) -> List[str]:
+        keys = []
+        if lead.get("place_id"):
+            keys.append(f"id:{lead['place_id']}")
+        phone = lead.get("phone_e164") or normalize_phone(lead.get("phone") or "", (country_code or self.country_code).upper())
+        if phone:
+            keys.append(f"tel:{phone}")
+        name = normalize_business_name(lead.get("name", ""))
+        if name and lead.get("latitude") is not None and lead.get("longitude") is not None:
+            cell = encode_geohash(lead["latitude"], lead["longitude"], NAME_GEOHASH_PRECISION)
+            keys.append(f"name:{name}|{cell}")
+        return keys
+
+    def find(self, lead: Dict[str, Any], country_code: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """The lead already kept for this lead's entity, if any."""
+        return next((self._entities[key] for key in self.keys(lead, country_code) if key in self._entities), None)
+
+    def add(self, lead: Dict[str, Any], country_code: Optional[str] = None) -> Tuple[Dict[str, Any], bool]:
+        """
+        Index a lead; returns (the lead kept for its entity, whether it is new).
+        country_code overrides the index country for this lead's phone number.
+        """
+        keys = self.keys(lead, country_code)
+        existing = next((self._entities[key] for key in keys if key in self._entities), None)
+        if existing is None:
+            self.leads.append(lead)
+            kept = lead
+        else:
+            merge_lead(existing, lead)
+            self.duplicates += 1
+            kept = existing
+        for key in keys:
+            self._entities.setdefault(key, kept)
+        return kept, existing is None
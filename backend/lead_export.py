@@ -0,0 +1,90 @@
+"""
+CSV / XLSX export of pitched leads.
+
+Rows are written batch by batch as the lead pipeline (or a campaign job's
+stored results) yields them, so memory stays flat however many leads there are.
+"""
+
+import io
+import re
+import csv
+import asyncio
+import logging
+import tempfile
+from typing import Any, AsyncIterator, Dict, List
+
+from openpyxl import Workbook
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+EXPORT_COLUMNS = [
+    "name", "address", "phone", "phone_e164", "distance_km", "industry", "status",
+    "location", "matched_industries", "power_pitch", "whatsapp_link",
+]
+
+# Spooled XLSX output moves to disk past this size
+XLSX_SPOOL_BYTES = 8 * 1024 * 1024
+XLSX_CHUNK_BYTES = 64 * 1024
+
+_PHONE_LIKE = re.compile(r'^[+\-][\d\s()\-]+$')
+
+
+def _cell(value: Any) -> Any:
+    """Spreadsheet-safe cell: lists joined, formula-looking text neutralized."""
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        value = "; ".join(str(item) for item in value)
+    if isinstance(value, str) and value[:1] in ("=", "+", "-", "@") and not _PHONE_LIKE.match(value):
+        return "'" + value
+    return value
+
+
+def _row(lead: Dict[str, Any]) -> List[Any]:
+    return [_cell(lead.get(column)) for column in EXPORT_COLUMNS]
+
+
+async def iter_csv(batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+    rows = 0
+    async for leads in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(_row(lead) for lead in leads)
+        rows += len(leads)
+        yield buffer.getvalue()
+    logger.info(f"CSV export finished: {rows} leads")
+
+
+async def iter_xlsx(batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    """
+    XLSX is a zip archive, so it can only be sent once complete: rows go to a
+    write-only workbook (spilled to temp files by openpyxl) and the saved file
+    is then streamed in chunks.
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Leads")
+    sheet.append(EXPORT_COLUMNS)
+    rows = 0
+    async for leads in batches:
+        for lead in leads:
+            sheet.append(_row(lead))
+        rows += len(leads)
+
+    with tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_BYTES) as output:
+        await asyncio.to_thread(workbook.save, output)
+        output.seek(0)
+        logger.info(f"XLSX export finished: {rows} leads")
+        while True:
+            chunk = output.read(XLSX_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
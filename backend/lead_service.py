@@ -1,7 +1,11 @@
 import os
+import re
+import json
+import uuid
+import asyncio
 import logging
 import urllib.parse
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from dotenv import load_dotenv
 from pathlib import Path
 
@@ -9,27 +13,96 @@ ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 from emergentintegrations.llm.chat import LlmChat, UserMessage
+from single_flight import SingleFlight
+from cache_store import CACHE_DIR, TieredCache, normalize_key
+from pitch_templates import DEFAULT_LANGUAGE, RenderedPitch, pitch_template_engine
+from phone_normalizer import DEFAULT_PHONE_COUNTRY, normalize_phone, normalize_phones
 
 logger = logging.getLogger(__name__)
 
+# AI pitches run concurrently under a shared budget; slow ones fall back to the template
+AI_PITCH_CONCURRENCY = int(os.environ.get('AI_PITCH_CONCURRENCY', '5'))
+AI_PITCH_TIMEOUT_SECONDS = float(os.environ.get('AI_PITCH_TIMEOUT_SECONDS', '20'))
+
+# Batched mode: up to AI_PITCH_BATCH_SIZE leads share one LLM call (1 disables batching)
+AI_PITCH_BATCH_SIZE = int(os.environ.get('AI_PITCH_BATCH_SIZE', '20'))
+AI_PITCH_BATCH_TIMEOUT_SECONDS = float(os.environ.get('AI_PITCH_BATCH_TIMEOUT_SECONDS', '45'))
+
+# AI pitch cache keyed by (sender, offering, target, industry). Industry
+# "skeletons" let new targets in a known industry reuse an AI pitch by name
+# substitution instead of another LLM call.
+PITCH_CACHE_TTL_SECONDS = float(os.environ.get('PITCH_CACHE_TTL_SECONDS', str(7 * 24 * 3600)))
+PITCH_CACHE_MAX_ENTRIES = int(os.environ.get('PITCH_CACHE_MAX_ENTRIES', '4096'))
+PITCH_CACHE_PATH = os.environ.get('PITCH_CACHE_PATH', str(CACHE_DIR / 'pitches.sqlite3'))
+PITCH_SKELETON_ENABLED = os.environ.get('PITCH_SKELETON_ENABLED', 'true').lower() == 'true'
+SKELETON_TARGET_TOKEN = "{{target_business_name}}"
+
+PITCH_SYSTEM_MESSAGE = """You are a B2B sales copywriter. Generate a SHORT, professional WhatsApp outreach message. 
+Keep it under 50 words. Be warm but professional. Include a call-to-action asking if they want a price list/portfolio.
+Do NOT use emojis. Start with 'Hi [business] team,'."""
+
+BATCH_PITCH_SYSTEM_MESSAGE = """You are a B2B sales copywriter. For EACH target business, generate a SHORT, professional WhatsApp outreach message.
+Keep each under 50 words. Be warm but professional. Include a call-to-action asking if they want a price list/portfolio.
+Do NOT use emojis. Start each with 'Hi [business] team,'.
+Respond with a JSON array only, no markdown: [{"index": <number>, "pitch": "<message>"}, ...]"""
+
 
 class LeadService:
     def __init__(self):
         self.api_key = os.environ.get('EMERGENT_LLM_KEY')
+        # Identical concurrent pitch requests share one LLM call
+        self._pitch_flight = SingleFlight("leads.ai_pitch")
+        self._ai_semaphore = asyncio.Semaphore(max(1, AI_PITCH_CONCURRENCY))
+        pitch_db = Path(PITCH_CACHE_PATH) if PITCH_CACHE_PATH else None
+        self.pitch_cache = TieredCache(
+            "ai_pitch",
+            max_entries=PITCH_CACHE_MAX_ENTRIES,
+            ttl_seconds=PITCH_CACHE_TTL_SECONDS,
+            db_path=pitch_db
+        )
+        self.skeleton_cache = TieredCache(
+            "pitch_skeleton",
+            max_entries=PITCH_CACHE_MAX_ENTRIES,
+            ttl_seconds=PITCH_CACHE_TTL_SECONDS,
+            db_path=pitch_db.with_name(pitch_db.stem + "_skeletons.sqlite3") if pitch_db else None
+        )
+        self.skeleton_pitches = 0
         
     async def generate_power_pitch(
         self,
         user_business_name: str,
         user_core_offering: str,
         target_business_name: str,
-        target_industry: str
+        target_industry: str,
+        language: str = DEFAULT_LANGUAGE
     ) -> str:
-        """Generate a personalized power pitch message using AI."""
+        """Generate a personalized power pitch message from the template engine."""
         
         # Standard template-based pitch (fast, reliable)
-        pitch = f'Hi {target_business_name} team, Greetings From {user_business_name}. We are veterans specializing in {user_core_offering}. We offer premium service with world-class products that fit your needs. Can we share our 2026 Price List/Portfolio?'
-        
-        return pitch
+        return self.render_power_pitch(
+            user_business_name,
+            user_core_offering,
+            target_business_name,
+            target_industry,
+            language
+        ).text
+    
+    def render_power_pitch(
+        self,
+        user_business_name: str,
+        user_core_offering: str,
+        target_business_name: str,
+        target_industry: str,
+        language: str = DEFAULT_LANGUAGE
+    ) -> RenderedPitch:
+        """Template pitch plus its URL-encoded form (static parts are pre-encoded)."""
+        return pitch_template_engine.render(
+            user_business_name,
+            user_core_offering,
+            target_business_name,
+            target_industry,
+            language
+        )
     
     async def generate_ai_enhanced_pitch(
         self,
@@ -39,28 +112,22 @@ class LeadService:
         target_industry: str
     ) -> str:
         """Generate an AI-enhanced personalized pitch using Gemini 3 Flash."""
+        cached = self.get_cached_pitch(user_business_name, user_core_offering, target_business_name, target_industry)
+        if cached is not None:
+            return cached
+        
         try:
-            chat = LlmChat(
-                api_key=self.api_key,
-                session_id=f"lead-pitch-{target_business_name}",
-                system_message="""You are a B2B sales copywriter. Generate a SHORT, professional WhatsApp outreach message. 
-Keep it under 50 words. Be warm but professional. Include a call-to-action asking if they want a price list/portfolio.
-Do NOT use emojis. Start with 'Hi [business] team,'."""
-            ).with_model("gemini", "gemini-3-flash-preview")
-            
-            user_message = UserMessage(
-                text=f"""Generate a brief B2B outreach message:
-- Sender: {user_business_name}
-- Sender's Offering: {user_core_offering}
-- Target Business: {target_business_name}
-- Target Industry: {target_industry}
-
-Make it relevant to why this industry needs the offering."""
+            flight_key = (user_business_name, user_core_offering, target_business_name, target_industry)
+            return await self._pitch_flight.do(
+                flight_key,
+                lambda: self._fetch_ai_pitch(
+                    user_business_name,
+                    user_core_offering,
+                    target_business_name,
+                    target_industry
+                )
             )
             
-            response = await chat.send_message(user_message)
-            return response.strip()
-            
         except Exception as e:
             logger.error(f"AI pitch generation failed: {str(e)}")
             # Fallback to template
@@ -71,52 +138,328 @@ Make it relevant to why this industry needs the offering."""
                 target_industry
             )
     
-    def generate_whatsapp_link(self, phone: str, message: str) -> str:
-        """Generate a WhatsApp click-to-chat link with pre-filled message."""
-        # Clean phone number - remove spaces, dashes, etc.
-        clean_phone = ''.join(filter(str.isdigit, phone))
+    def _pitch_key(self, *parts: str) -> str:
+        return "\x1f".join(normalize_key(part) for part in parts)
+    
+    def get_cached_pitch(
+        self,
+        user_business_name: str,
+        user_core_offering: str,
+        target_business_name: str,
+        target_industry: str
+    ) -> Optional[str]:
+        """Cached AI pitch for this target, else one built from the industry skeleton."""
+        pitch = self.pitch_cache.get(
+            self._pitch_key(user_business_name, user_core_offering, target_business_name, target_industry)
+        )
+        if pitch is not None or not PITCH_SKELETON_ENABLED:
+            return pitch
         
-        # Add country code if not present (assuming India)
-        if clean_phone and not clean_phone.startswith('91') and len(clean_phone) == 10:
-            clean_phone = '91' + clean_phone
+        skeleton = self.skeleton_cache.get(self._pitch_key(user_business_name, user_core_offering, target_industry))
+        if skeleton is None:
+            return None
+        self.skeleton_pitches += 1
+        return skeleton.replace(SKELETON_TARGET_TOKEN, target_business_name)
+    
+    def remember_pitch(
+        self,
+        user_business_name: str,
+        user_core_offering: str,
+        target_business_name: str,
+        target_industry: str,
+        pitch: str
+    ) -> None:
+        """Cache an AI pitch and derive the industry skeleton from it."""
+        self.pitch_cache.set(
+            self._pitch_key(user_business_name, user_core_offering, target_business_name, target_industry),
+            pitch
+        )
+        if not PITCH_SKELETON_ENABLED or len(target_business_name.strip()) < 3:
+            return
+        name_pattern = re.compile(r'(?<!\w)' + re.escape(target_business_name) + r'(?!\w)')
+        skeleton, replaced = name_pattern.subn(SKELETON_TARGET_TOKEN, pitch)
+        if replaced:
+            self.skeleton_cache.set(
+                self._pitch_key(user_business_name, user_core_offering, target_industry),
+                skeleton
+            )
+    
+    async def _fetch_ai_pitch(
+        self,
+        user_business_name: str,
+        user_core_offering: str,
+        target_business_name: str,
+        target_industry: str
+    ) -> str:
+        """
+        The shared LLM call behind a pitch flight. It holds a concurrency slot
+        until the call really ends and caches its result, even when every
+        caller has already timed out and used the template.
+        """
+        async with self._ai_semaphore:
+            pitch = await self._request_ai_pitch(
+                user_business_name,
+                user_core_offering,
+                target_business_name,
+                target_industry
+            )
+        self.remember_pitch(user_business_name, user_core_offering, target_business_name, target_industry, pitch)
+        return pitch
+    
+    async def _request_ai_pitch(
+        self,
+        user_business_name: str,
+        user_core_offering: str,
+        target_business_name: str,
+        target_industry: str
+    ) -> str:
+        chat = LlmChat(
+            api_key=self.api_key,
+            session_id=f"lead-pitch-{target_business_name}",
+            system_message=PITCH_SYSTEM_MESSAGE
+        ).with_model("gemini", "gemini-3-flash-preview")
+        
+        user_message = UserMessage(
+            text=f"""Generate a brief B2B outreach message:
+- Sender: {user_business_name}
+- Sender's Offering: {user_core_offering}
+- Target Business: {target_business_name}
+- Target Industry: {target_industry}
+
+Make it relevant to why this industry needs the offering."""
+        )
+        
+        response = await chat.send_message(user_message)
+        return response.strip()
+    
+    def generate_whatsapp_link(
+        self,
+        phone: str,
+        message: str,
+        encoded_message: Optional[str] = None,
+        country_code: str = DEFAULT_PHONE_COUNTRY
+    ) -> str:
+        """Generate a WhatsApp click-to-chat link with pre-filled message ("" for invalid numbers)."""
+        e164_phone = normalize_phone(phone or "", country_code)
+        if not e164_phone:
+            return ""
+        return self._whatsapp_url(e164_phone, message, encoded_message)
+    
+    def _whatsapp_url(self, e164_phone: str, message: str, encoded_message: Optional[str] = None) -> str:
+        # URL encode the message (template pitches arrive already encoded)
+        if encoded_message is None:
+            encoded_message = urllib.parse.quote(message)
+        
+        return f"https://wa.me/{e164_phone}?text={encoded_message}"
+    
+    async def generate_ai_pitches_batch(
+        self,
+        user_business_name: str,
+        user_core_offering: str,
+        targets: List[Tuple[str, str]]
+    ) -> List[Optional[str]]:
+        """
+        Generate AI pitches for many (target_business_name, target_industry)
+        pairs in one LLM call. Entries missing or malformed in the reply are None.
+        """
+        chat = LlmChat(
+            api_key=self.api_key,
+            session_id=f"lead-pitch-batch-{uuid.uuid4().hex}",
+            system_message=BATCH_PITCH_SYSTEM_MESSAGE
+        ).with_model("gemini", "gemini-3-flash-preview")
+        
+        target_lines = "\n".join(
+            f"{index}. Target Business: {name} | Target Industry: {industry}"
+            for index, (name, industry) in enumerate(targets)
+        )
+        user_message = UserMessage(
+            text=f"""Generate a brief B2B outreach message for each target business below:
+- Sender: {user_business_name}
+- Sender's Offering: {user_core_offering}
+
+Targets:
+{target_lines}
+
+Make each relevant to why that industry needs the offering. Return exactly {len(targets)} items."""
+        )
+        
+        response = await chat.send_message(user_message)
+        return self._parse_batch_pitches(response, len(targets))
+    
+    def _parse_batch_pitches(self, response: str, count: int) -> List[Optional[str]]:
+        pitches: List[Optional[str]] = [None] * count
+        match = re.search(r'\[.*\]', response, re.DOTALL)
+        if not match:
+            logger.warning("Batch pitch response contained no JSON array")
+            return pitches
+        try:
+            items = json.loads(match.group())
+        except json.JSONDecodeError:
+            logger.warning(f"Failed to parse batch pitch response: {response[:300]}")
+            return pitches
         
-        # URL encode the message
-        encoded_message = urllib.parse.quote(message)
+        for item in items if isinstance(items, list) else []:
+            if not isinstance(item, dict):
+                continue
+            index = item.get("index")
+            pitch = item.get("pitch")
+            if isinstance(index, int) and 0 <= index < count and isinstance(pitch, str) and pitch.strip():
+                pitches[index] = pitch.strip()
+        return pitches
+    
+    async def _batched_ai_pitches(
+        self,
+        user_business_name: str,
+        user_core_offering: str,
+        leads: List[Dict[str, Any]]
+    ) -> List[str]:
+        """
+        One LLM call per chunk of leads. Leads missing or malformed in a reply
+        fall back to per-lead calls; if a whole batch call fails or times out,
+        its leads get template pitches rather than one LLM call each.
+        """
+        async def run_chunk(chunk):
+            async with self._ai_semaphore:
+                try:
+                    return await asyncio.wait_for(
+                        self.generate_ai_pitches_batch(
+                            user_business_name,
+                            user_core_offering,
+                            [(lead["name"], lead["industry"]) for lead in chunk]
+                        ),
+                        timeout=AI_PITCH_BATCH_TIMEOUT_SECONDS
+                    )
+                except Exception as e:
+                    logger.error(f"Batch AI pitch generation failed for {len(chunk)} leads, using templates: {str(e)}")
+                    return None
+        
+        chunks = [leads[i:i + AI_PITCH_BATCH_SIZE] for i in range(0, len(leads), AI_PITCH_BATCH_SIZE)]
+        chunk_results = await asyncio.gather(*[run_chunk(chunk) for chunk in chunks])
+        pitches: List[Optional[str]] = []
+        for chunk, result in zip(chunks, chunk_results):
+            if result is None:
+                pitches.extend([
+                    await self.generate_power_pitch(user_business_name, user_core_offering, lead["name"], lead["industry"])
+                    for lead in chunk
+                ])
+                continue
+            for lead, pitch in zip(chunk, result):
+                if pitch is not None:
+                    self.remember_pitch(user_business_name, user_core_offering, lead["name"], lead["industry"], pitch)
+            pitches.extend(result)
         
-        return f"https://wa.me/{clean_phone}?text={encoded_message}"
+        missing = [i for i, pitch in enumerate(pitches) if pitch is None]
+        if missing:
+            logger.info(f"Falling back to per-lead AI pitches for {len(missing)} of {len(leads)} leads")
+            fallbacks = await asyncio.gather(*[
+                self._bounded_ai_pitch(
+                    user_business_name,
+                    user_core_offering,
+                    leads[i]["name"],
+                    leads[i]["industry"]
+                )
+                for i in missing
+            ])
+            for i, pitch in zip(missing, fallbacks):
+                pitches[i] = pitch
+        return pitches
+    
+    async def _bounded_ai_pitch(
+        self,
+        user_business_name: str,
+        user_core_offering: str,
+        target_business_name: str,
+        target_industry: str
+    ) -> str:
+        """AI pitch (LLM calls share the concurrency budget), falling back to the template on timeout."""
+        try:
+            return await asyncio.wait_for(
+                self.generate_ai_enhanced_pitch(
+                    user_business_name,
+                    user_core_offering,
+                    target_business_name,
+                    target_industry
+                ),
+                timeout=AI_PITCH_TIMEOUT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"AI pitch timed out for {target_business_name}, using template")
+        return await self.generate_power_pitch(
+            user_business_name,
+            user_core_offering,
+            target_business_name,
+            target_industry
+        )
     
     async def process_leads(
         self,
         leads: List[Dict[str, Any]],
         user_business_name: str,
         user_core_offering: str,
-        use_ai_pitch: bool = False
+        use_ai_pitch: bool = False,
+        language: str = DEFAULT_LANGUAGE,
+        country_code: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """Process leads and add power pitches and WhatsApp links."""
-        processed_leads = []
-        
-        for lead in leads:
-            if use_ai_pitch:
-                pitch = await self.generate_ai_enhanced_pitch(
+        # Normalize the whole batch up front; invalid numbers never get a link
+        e164_phones = normalize_phones(
+            [lead.get("phone") or "" for lead in leads],
+            country_code or DEFAULT_PHONE_COUNTRY
+        )
+        # Leads pitched before (e.g. upgraded by a pitch job) keep their number
+        e164_phones = [
+            lead["phone_e164"] if "phone_e164" in lead else e164_phone
+            for lead, e164_phone in zip(leads, e164_phones)
+        ]
+        encoded_pitches: List[Optional[str]] = [None] * len(leads)
+        if use_ai_pitch and AI_PITCH_BATCH_SIZE > 1 and len(leads) > 1:
+            # Serve cached / skeleton pitches first, batch only the rest
+            pitches = [
+                self.get_cached_pitch(user_business_name, user_core_offering, lead["name"], lead["industry"])
+                for lead in leads
+            ]
+            uncached = [i for i, pitch in enumerate(pitches) if pitch is None]
+            if uncached:
+                generated = await self._batched_ai_pitches(
+                    user_business_name, user_core_offering, [leads[i] for i in uncached]
+                )
+                for i, pitch in zip(uncached, generated):
+                    pitches[i] = pitch
+        elif use_ai_pitch:
+            # gather keeps the input order
+            pitches = await asyncio.gather(*[
+                self._bounded_ai_pitch(
                     user_business_name,
                     user_core_offering,
                     lead["name"],
                     lead["industry"]
                 )
-            else:
-                pitch = await self.generate_power_pitch(
+                for lead in leads
+            ])
+        else:
+            rendered = [
+                self.render_power_pitch(
                     user_business_name,
                     user_core_offering,
                     lead["name"],
-                    lead["industry"]
+                    lead["industry"],
+                    language
                 )
-            
+                for lead in leads
+            ]
+            pitches = [pitch.text for pitch in rendered]
+            encoded_pitches = [pitch.encoded for pitch in rendered]
+        
+        processed_leads = []
+        
+        for lead, pitch, encoded_pitch, e164_phone in zip(leads, pitches, encoded_pitches, e164_phones):
             whatsapp_link = ""
-            if lead.get("phone"):
-                whatsapp_link = self.generate_whatsapp_link(lead["phone"], pitch)
+            if e164_phone:
+                whatsapp_link = self._whatsapp_url(e164_phone, pitch, encoded_pitch)
             
             processed_lead = {
                 **lead,
+                "phone_e164": e164_phone,
                 "power_pitch": pitch,
                 "whatsapp_link": whatsapp_link
             }
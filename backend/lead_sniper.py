@@ -1,15 +1,21 @@
-Create backend/lead_sniper.py on main branch:
-Go to: https://github.com/jaisinghbhatti/jaipal-portfolio-v5/tree/main/backend
-Click "Add file" → "Create new file"
-Name it: lead_sniper.py
-Paste this code:
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
+import asyncio
+import json
 import logging
+from collections import deque
 
 from places_service import places_service
 from lead_service import lead_service
+from pitch_jobs import pitch_job_manager
+from campaign_jobs import campaign_job_queue
+from lead_dedupe import LeadIndex
+from lead_export import EXPORT_FORMATS, iter_csv, iter_xlsx
+from single_flight import single_flight_stats
+from phone_normalizer import phone_cache_stats
 
 router = APIRouter(prefix="/api/leads", tags=["leads"])
 
@@ -24,14 +30,39 @@ class LeadSearchRequest(BaseModel):
     target_industry: str = Field(..., description="Target client industry to search for")
     search_radius_km: int = Field(default=10, ge=1, le=50, description="Search radius in kilometers")
     use_ai_pitch: bool = Field(default=False, description="Use AI to generate personalized pitches")
+    coverage_mode: bool = Field(default=False, description="Cover the whole radius with concurrent tiled searches instead of one biased search")
+    max_leads: int = Field(default=20, ge=1, le=500, description="Maximum number of leads to return (60 max unless coverage_mode is on)")
+    require_phone: bool = Field(default=False, description="Only return businesses with a phone number")
+    operational_only: bool = Field(default=False, description="Only return businesses that are currently operational")
+    pitch_language: str = Field(default="en", description="Language of template pitches (en, hi)")
+    defer_ai_pitch: bool = Field(default=False, description="With use_ai_pitch, return template pitches at once and upgrade them to AI pitches in a background job")
+
+class LeadBatchSearchRequest(BaseModel):
+    user_business_name: str = Field(..., description="User's business name")
+    user_locations: List[str] = Field(..., description="Locations (cities, localities) to search around")
+    user_core_offering: str = Field(..., description="What the user sells/offers")
+    target_industries: List[str] = Field(..., description="Target client industries to search for")
+    search_radius_km: int = Field(default=10, ge=1, le=50, description="Search radius in kilometers")
+    use_ai_pitch: bool = Field(default=False, description="Use AI to generate personalized pitches")
+    defer_ai_pitch: bool = Field(default=False, description="With use_ai_pitch, return template pitches at once and upgrade them to AI pitches in a background job")
+    coverage_mode: bool = Field(default=False, description="Cover each radius with tiled searches instead of one biased search")
+    max_leads_per_search: int = Field(default=20, ge=1, le=60, description="Maximum leads kept per location and industry")
+    max_leads: int = Field(default=200, ge=1, le=5000, description="Maximum number of merged leads to return")
+    require_phone: bool = Field(default=False, description="Only return businesses with a phone number")
+    operational_only: bool = Field(default=False, description="Only return businesses that are currently operational")
+    pitch_language: str = Field(default="en", description="Language of template pitches (en, hi)")
 
 class Lead(BaseModel):
+    place_id: Optional[str] = None
     name: str
     address: str
     phone: str
     distance_km: float
     industry: str
     status: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    phone_e164: Optional[str] = None
     power_pitch: str
     whatsapp_link: str
 
@@ -43,6 +74,27 @@ class LeadSearchResponse(BaseModel):
     search_radius_km: int
     leads: List[Lead]
     message: str
+    ai_job_id: Optional[str] = None
+
+class BatchLead(Lead):
+    location: str
+    matched_industries: List[str]
+
+class LeadBatchSearchResponse(BaseModel):
+    success: bool
+    total_results: int
+    searches: int
+    user_coordinates: dict
+    failed_locations: List[str]
+    failed_searches: int
+    leads: List[BatchLead]
+    message: str
+    ai_job_id: Optional[str] = None
+
+
+# Locations x industries per batch request / campaign job
+MAX_BATCH_SEARCHES = 300
+MAX_CAMPAIGN_SEARCHES = 5000
 
 
 @router.get("/health")
@@ -50,6 +102,126 @@ async def leads_health():
     return {"status": "healthy", "service": "lead-sniper"}
 
 
+@router.get("/stats")
+async def leads_stats():
+    """Cache and upstream-call counters for the lead pipeline."""
+    return {
+        "geocode_cache": places_service.geocode_cache.stats(),
+        "search_cache": {
+            **places_service.search_cache.stats(),
+            **places_service.search_counters
+        },
+        "pitch_cache": lead_service.pitch_cache.stats(),
+        "pitch_skeletons": {
+            **lead_service.skeleton_cache.stats(),
+            "pitches_from_skeleton": lead_service.skeleton_pitches
+        },
+        "phone_normalizer": phone_cache_stats(),
+        "lead_store": places_service.lead_store.stats() if places_service.lead_store else None,
+        "pitch_jobs": pitch_job_manager.stats(),
+        "campaign_jobs": campaign_job_queue.stats(),
+        "single_flight": single_flight_stats()
+    }
+
+
+async def _geocode_or_400(request: LeadSearchRequest) -> dict:
+    coordinates = await places_service.geocode_location_async(request.user_location)
+    
+    if not coordinates:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Could not find location: {request.user_location}. Please provide a valid address or city."
+        )
+    return coordinates
+
+
+async def _iter_raw_leads(request: LeadSearchRequest, coordinates: dict) -> AsyncIterator[List[dict]]:
+    """
+    Search for businesses and yield formatted (not yet pitched) leads batch by
+    batch, each business once even if it shows up under another name or page.
+    """
+    radius_meters = request.search_radius_km * 1000
+    index = LeadIndex(coordinates.get("country_code"))
+    
+    if request.coverage_mode:
+        places = await places_service.search_coverage(
+            latitude=coordinates["latitude"],
+            longitude=coordinates["longitude"],
+            keyword=request.target_industry,
+            radius=radius_meters
+        )
+        leads = places_service.format_places_for_leads(
+            places,
+            coordinates["latitude"],
+            coordinates["longitude"],
+            radius_km=request.search_radius_km,
+            limit=request.max_leads,
+            require_phone=request.require_phone,
+            operational_only=request.operational_only
+        )
+        yield [lead for lead in leads if index.add(lead)[1]]
+        return
+    
+    # One batch per page; the next page is fetched while the caller works on this one
+    async for places in places_service.iter_search_pages(
+        latitude=coordinates["latitude"],
+        longitude=coordinates["longitude"],
+        keyword=request.target_industry,
+        radius=radius_meters,
+        max_results=request.max_leads
+    ):
+        leads = places_service.format_places_for_leads(
+            places,
+            coordinates["latitude"],
+            coordinates["longitude"],
+            radius_km=request.search_radius_km,
+            require_phone=request.require_phone,
+            operational_only=request.operational_only
+        )
+        yield [lead for lead in leads if index.add(lead)[1]]
+
+
+def _defers_ai_pitch(request: LeadSearchRequest) -> bool:
+    return request.use_ai_pitch and request.defer_ai_pitch
+
+
+async def _pitch_leads(request: LeadSearchRequest, coordinates: dict, raw_leads: List[dict]) -> List[dict]:
+    return await lead_service.process_leads(
+        raw_leads,
+        request.user_business_name,
+        request.user_core_offering,
+        request.use_ai_pitch and not request.defer_ai_pitch,
+        request.pitch_language,
+        coordinates.get("country_code")
+    )
+
+
+async def _iter_pitched_batches(request: LeadSearchRequest, coordinates: dict) -> AsyncIterator[List[dict]]:
+    """
+    Pitch each page as soon as it arrives, without waiting for the previous
+    page's pitches, so AI pitch calls for all pages run concurrently; batches
+    are yielded in page order.
+    """
+    pending = deque()
+    try:
+        async for raw_leads in _iter_raw_leads(request, coordinates):
+            pending.append(asyncio.ensure_future(_pitch_leads(request, coordinates, raw_leads)))
+            while pending and pending[0].done():
+                yield pending.popleft().result()
+        while pending:
+            yield await pending[0]
+            pending.popleft()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def _summary_message(request: LeadSearchRequest, total: int) -> str:
+    if not total:
+        return f"No {request.target_industry} businesses found within {request.search_radius_km}km of {request.user_location}. Try increasing the search radius or changing the target industry."
+    return f"Found {total} potential leads in {request.target_industry} within {request.search_radius_km}km of {request.user_location}."
+
+
 @router.post("/search", response_model=LeadSearchResponse)
 async def search_leads(request: LeadSearchRequest):
     """
@@ -59,50 +231,23 @@ async def search_leads(request: LeadSearchRequest):
         logger.info(f"Lead search request: {request.user_business_name} looking for {request.target_industry} near {request.user_location}")
         
         # Step 1: Geocode user's location
-        coordinates = places_service.geocode_location(request.user_location)
-        
-        if not coordinates:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Could not find location: {request.user_location}. Please provide a valid address or city."
-            )
+        coordinates = await _geocode_or_400(request)
         
-        # Step 2: Search for businesses in target industry
-        radius_meters = request.search_radius_km * 1000
+        # Steps 2-4: Search, format and pitch leads
+        processed_leads = []
+        async for leads in _iter_pitched_batches(request, coordinates):
+            processed_leads.extend(leads)
+        processed_leads.sort(key=lambda lead: lead["distance_km"])
         
-        places = places_service.search_nearby(
-            latitude=coordinates["latitude"],
-            longitude=coordinates["longitude"],
-            keyword=request.target_industry,
-            radius=radius_meters,
-            max_results=20
-        )
-        
-        if not places:
-            return LeadSearchResponse(
-                success=True,
-                total_results=0,
-                user_location=request.user_location,
-                user_coordinates=coordinates,
-                search_radius_km=request.search_radius_km,
-                leads=[],
-                message=f"No {request.target_industry} businesses found within {request.search_radius_km}km of {request.user_location}. Try increasing the search radius or changing the target industry."
-            )
-        
-        # Step 3: Format places as leads
-        raw_leads = places_service.format_places_for_leads(
-            places,
-            coordinates["latitude"],
-            coordinates["longitude"]
-        )
-        
-        # Step 4: Generate power pitches and WhatsApp links
-        processed_leads = await lead_service.process_leads(
-            raw_leads,
-            request.user_business_name,
-            request.user_core_offering,
-            request.use_ai_pitch
-        )
+        # Step 5: Upgrade the template pitches to AI pitches in the background
+        ai_job_id = None
+        if _defers_ai_pitch(request) and processed_leads:
+            ai_job_id = pitch_job_manager.submit(
+                processed_leads,
+                request.user_business_name,
+                request.user_core_offering,
+                coordinates.get("country_code")
+            ).id
         
         return LeadSearchResponse(
             success=True,
@@ -111,7 +256,8 @@ async def search_leads(request: LeadSearchRequest):
             user_coordinates=coordinates,
             search_radius_km=request.search_radius_km,
             leads=processed_leads,
-            message=f"Found {len(processed_leads)} potential leads in {request.target_industry} within {request.search_radius_km}km of {request.user_location}."
+            message=_summary_message(request, len(processed_leads)),
+            ai_job_id=ai_job_id
         )
         
     except HTTPException:
@@ -122,3 +268,385 @@ async def search_leads(request: LeadSearchRequest):
             status_code=500,
             detail=f"Error searching for leads: {str(e)}"
         )
+
+
+def _dedupe_strings(values: List[str]) -> List[str]:
+    seen = {}
+    for value in values:
+        value = value.strip()
+        if value:
+            seen.setdefault(value.lower(), value)
+    return list(seen.values())
+
+
+def _validate_batch_request(request: LeadBatchSearchRequest, max_searches: int) -> None:
+    """Dedupe locations and industries in place and enforce the search limit."""
+    request.user_locations = _dedupe_strings(request.user_locations)
+    request.target_industries = _dedupe_strings(request.target_industries)
+    if not request.user_locations or not request.target_industries:
+        raise HTTPException(status_code=400, detail="Provide at least one location and one target industry.")
+    searches = len(request.user_locations) * len(request.target_industries)
+    if searches > max_searches:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many searches in one request ({searches}); the limit is {max_searches} locations x industries."
+        )
+
+
+def _merge_batch_leads(
+    request: LeadBatchSearchRequest,
+    searched: List[tuple],
+    results: List[List[object]]
+) -> tuple:
+    """
+    Format every search and resolve businesses found by several searches to
+    one lead: the nearest location wins and matched industries accumulate.
+    """
+    index = LeadIndex()
+    failed = 0
+    for (location, coordinates), row in zip(searched, results):
+        for industry, places in zip(request.target_industries, row):
+            if isinstance(places, Exception):
+                failed += 1
+                logger.warning(f"Batch search failed for {industry} near {location}: {places}")
+                continue
+            leads = places_service.format_places_for_leads(
+                places,
+                coordinates["latitude"],
+                coordinates["longitude"],
+                radius_km=request.search_radius_km,
+                limit=request.max_leads_per_search,
+                require_phone=request.require_phone,
+                operational_only=request.operational_only
+            )
+            for lead in leads:
+                index.add({**lead, "location": location, "matched_industries": [industry]}, coordinates.get("country_code"))
+    
+    # Businesses matching more of the target industries first, then nearest
+    ranked = sorted(index.leads, key=lambda lead: (-len(lead["matched_industries"]), lead["distance_km"]))
+    return ranked[:request.max_leads], failed
+
+
+@router.post("/search/batch", response_model=LeadBatchSearchResponse)
+async def search_leads_batch(request: LeadBatchSearchRequest):
+    """
+    Search several industries around several locations in one call and
+    return one merged, ranked set of leads (each business once).
+    """
+    _validate_batch_request(request, MAX_BATCH_SEARCHES)
+    
+    try:
+        logger.info(
+            f"Batch lead search request: {request.user_business_name} looking for "
+            f"{len(request.target_industries)} industries near {len(request.user_locations)} locations"
+        )
+        
+        # Step 1: Geocode each distinct location once
+        geocoded = await places_service.geocode_many(request.user_locations)
+        searched = [(location, coordinates) for location, coordinates in geocoded.items() if coordinates]
+        failed_locations = [location for location, coordinates in geocoded.items() if not coordinates]
+        
+        # Step 2: Fan out every (location, industry) search under one budget
+        results = await places_service.search_batch(
+            [(coordinates["latitude"], coordinates["longitude"]) for _, coordinates in searched],
+            request.target_industries,
+            radius=request.search_radius_km * 1000,
+            max_results=request.max_leads_per_search,
+            coverage=request.coverage_mode
+        )
+        
+        # Step 3: Merge businesses found under several industries or locations
+        leads, failed_searches = _merge_batch_leads(request, searched, results)
+        
+        # Step 4: Pitch each merged lead once, grouped by the country of its location
+        countries = {location: coordinates.get("country_code") for location, coordinates in searched}
+        groups = {}
+        for index, lead in enumerate(leads):
+            groups.setdefault(countries[lead["location"]], []).append(index)
+        defer = request.use_ai_pitch and request.defer_ai_pitch
+        
+        async def pitch_group(country_code, indexes):
+            processed = await lead_service.process_leads(
+                [leads[i] for i in indexes],
+                request.user_business_name,
+                request.user_core_offering,
+                request.use_ai_pitch and not defer,
+                request.pitch_language,
+                country_code
+            )
+            for i, lead in zip(indexes, processed):
+                leads[i] = lead
+        
+        await asyncio.gather(*[pitch_group(country, indexes) for country, indexes in groups.items()])
+        
+        ai_job_id = None
+        if defer and leads:
+            ai_job_id = pitch_job_manager.submit(
+                leads,
+                request.user_business_name,
+                request.user_core_offering
+            ).id
+        
+        if leads:
+            message = f"Found {len(leads)} unique leads across {len(request.target_industries)} industries near {len(searched)} locations."
+        else:
+            message = "No matching businesses found. Try increasing the search radius or changing the target industries."
+        
+        return LeadBatchSearchResponse(
+            success=True,
+            total_results=len(leads),
+            searches=len(searched) * len(request.target_industries),
+            user_coordinates={location: coordinates for location, coordinates in searched},
+            failed_locations=failed_locations,
+            failed_searches=failed_searches,
+            leads=leads,
+            message=message,
+            ai_job_id=ai_job_id
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in batch lead search: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error searching for leads: {str(e)}"
+        )
+
+
+def _format_event(event: str, data: dict, sse: bool) -> str:
+    payload = json.dumps(data, default=str)
+    if sse:
+        return f"event: {event}\ndata: {payload}\n\n"
+    return json.dumps({"event": event, "data": data}, default=str) + "\n"
+
+
+async def _stream_lead_events(request: LeadSearchRequest, coordinates: dict, sse: bool) -> AsyncIterator[str]:
+    yield _format_event("geocode", {
+        "user_location": request.user_location,
+        "user_coordinates": coordinates
+    }, sse)
+    
+    total = 0
+    deferred_leads: List[dict] = []
+    pending: List[asyncio.Task] = []
+    try:
+        async for raw_leads in _iter_raw_leads(request, coordinates):
+            if request.use_ai_pitch and not request.defer_ai_pitch:
+                # Pitch each lead on its own and emit whichever finishes first
+                pending = [
+                    asyncio.create_task(_pitch_leads(request, coordinates, [lead]))
+                    for lead in raw_leads
+                ]
+                for next_done in asyncio.as_completed(pending):
+                    for lead in await next_done:
+                        total += 1
+                        yield _format_event("lead", lead, sse)
+                pending = []
+            else:
+                for lead in await _pitch_leads(request, coordinates, raw_leads):
+                    total += 1
+                    if _defers_ai_pitch(request):
+                        deferred_leads.append(lead)
+                    yield _format_event("lead", lead, sse)
+    except Exception as e:
+        logger.error(f"Error in streaming lead search: {str(e)}")
+        yield _format_event("error", {"detail": f"Error searching for leads: {str(e)}"}, sse)
+        return
+    finally:
+        # Client went away or we failed: stop pitching leads nobody will read
+        for task in pending:
+            task.cancel()
+    
+    ai_job_id = None
+    if deferred_leads:
+        # Job indexes follow the order in which lead events were emitted
+        ai_job_id = pitch_job_manager.submit(
+            deferred_leads,
+            request.user_business_name,
+            request.user_core_offering,
+            coordinates.get("country_code")
+        ).id
+    
+    yield _format_event("summary", {
+        "success": True,
+        "total_results": total,
+        "user_location": request.user_location,
+        "user_coordinates": coordinates,
+        "search_radius_km": request.search_radius_km,
+        "message": _summary_message(request, total),
+        "ai_job_id": ai_job_id
+    }, sse)
+
+
+@router.post("/search/stream")
+async def search_leads_stream(
+    request: LeadSearchRequest,
+    http_request: Request,
+    format: Optional[str] = Query(default=None, description="ndjson (default) or sse")
+):
+    """
+    Streaming variant of /search: emits a geocode event, one lead event per
+    lead as soon as it is pitched, and a final summary event.
+    """
+    logger.info(f"Streaming lead search request: {request.user_business_name} looking for {request.target_industry} near {request.user_location}")
+    sse = format == "sse" or (format is None and "text/event-stream" in http_request.headers.get("accept", ""))
+    coordinates = await _geocode_or_400(request)
+    
+    return StreamingResponse(
+        _stream_lead_events(request, coordinates, sse),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _pitch_job_or_404(job_id: str):
+    job = pitch_job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Pitch job not found or expired: {job_id}")
+    return job
+
+
+@router.get("/pitch-jobs/{job_id}")
+async def get_pitch_job(job_id: str, since: int = Query(default=0, ge=0, description="Skip the first N pitch updates already received")):
+    """
+    Status of a background AI pitch job. Each pitch update replaces the
+    power_pitch and whatsapp_link of the lead at "index" in the search response.
+    """
+    return _pitch_job_or_404(job_id).to_dict(since)
+
+
+async def _stream_pitch_events(job, sse: bool) -> AsyncIterator[str]:
+    async for update in job.iter_updates():
+        yield _format_event("pitch", update, sse)
+    status = job.to_dict()
+    status.pop("pitches")
+    yield _format_event("done", status, sse)
+
+
+@router.get("/pitch-jobs/{job_id}/stream")
+async def stream_pitch_job(
+    job_id: str,
+    http_request: Request,
+    format: Optional[str] = Query(default=None, description="ndjson (default) or sse")
+):
+    """Stream AI pitch updates of a background job as they complete, then a done event."""
+    job = _pitch_job_or_404(job_id)
+    sse = format == "sse" or (format is None and "text/event-stream" in http_request.headers.get("accept", ""))
+    
+    return StreamingResponse(
+        _stream_pitch_events(job, sse),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _campaign_status_or_404(job_id: str) -> dict:
+    status = campaign_job_queue.status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Campaign job not found: {job_id}")
+    return status
+
+
+@router.post("/jobs")
+async def submit_campaign_job(request: LeadBatchSearchRequest):
+    """
+    Queue a large locations x industries campaign to run in the background.
+    AI pitches (use_ai_pitch) are generated inside the job; defer_ai_pitch is ignored.
+    """
+    _validate_batch_request(request, MAX_CAMPAIGN_SEARCHES)
+    job_id = campaign_job_queue.submit(jsonable_encoder(request))
+    logger.info(f"Campaign job {job_id} queued: {request.user_business_name}, {len(request.user_locations)} locations x {len(request.target_industries)} industries")
+    return _campaign_status_or_404(job_id)
+
+
+@router.get("/jobs/{job_id}")
+async def get_campaign_job(job_id: str):
+    """Progress of a campaign job, including throughput in leads per second."""
+    return _campaign_status_or_404(job_id)
+
+
+@router.get("/jobs/{job_id}/results")
+async def get_campaign_job_results(
+    job_id: str,
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=100, ge=1, le=1000)
+):
+    """Leads found so far, ranked by matched industries then distance."""
+    status = _campaign_status_or_404(job_id)
+    return {
+        **status,
+        "offset": offset,
+        "results": campaign_job_queue.store.results(job_id, offset, limit)
+    }
+
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_campaign_job(job_id: str):
+    status = _campaign_status_or_404(job_id)
+    if not campaign_job_queue.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Campaign job already {status['status']}")
+    return _campaign_status_or_404(job_id)
+
+
+def _check_export_format(format: str) -> None:
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format: {format}. Use csv or xlsx.")
+
+
+def _export_response(batches: AsyncIterator[List[dict]], format: str, filename: str) -> StreamingResponse:
+    rows = iter_csv(batches) if format == "csv" else iter_xlsx(batches)
+    return StreamingResponse(
+        rows,
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{format}"'}
+    )
+
+
+@router.post("/export")
+async def export_leads(
+    request: LeadSearchRequest,
+    format: str = Query(default="csv", description="csv or xlsx")
+):
+    """Run a lead search and download the pitched leads, written as each batch is ready."""
+    logger.info(f"Lead export request ({format}): {request.user_business_name} looking for {request.target_industry} near {request.user_location}")
+    _check_export_format(format)
+    coordinates = await _geocode_or_400(request)
+    
+    pitched = _iter_pitched_batches(request, coordinates)
+    
+    # Fetch the first batch up front so an early failure is still a proper error response
+    try:
+        first = await pitched.__anext__()
+    except StopAsyncIteration:
+        first = []
+    except Exception as e:
+        await pitched.aclose()
+        logger.error(f"Error in lead export: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error searching for leads: {str(e)}")
+    
+    async def batches():
+        try:
+            yield first
+            async for leads in pitched:
+                yield leads
+        finally:
+            await pitched.aclose()
+    
+    return _export_response(batches(), format, "leads")
+
+
+@router.get("/jobs/{job_id}/export")
+async def export_campaign_job(
+    job_id: str,
+    format: str = Query(default="csv", description="csv or xlsx")
+):
+    """Download a campaign job's leads (found so far), ranked like its results."""
+    _check_export_format(format)
+    _campaign_status_or_404(job_id)
+    
+    async def batches():
+        for leads in campaign_job_queue.store.result_batches(job_id):
+            yield leads
+    
+    return _export_response(batches(), format, f"campaign-{job_id}")
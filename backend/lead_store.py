@@ -0,0 +1,162 @@
+"""
+Local SQLite store of every place the Places API has returned.
+
+Places are indexed by geohash so radius queries are a handful of index range
+scans; per-keyword tile records say which areas were fetched recently enough
+to answer without calling Google.
+"""
+
+import json
+import time
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from geo_utils import encode_geohash, geohash_cover, radius_box
+from cache_store import normalize_key
+
+logger = logging.getLogger(__name__)
+
+PLACE_GEOHASH_PRECISION = 9
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS places (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    phone TEXT,
+    types TEXT,
+    latitude REAL NOT NULL,
+    longitude REAL NOT NULL,
+    status TEXT,
+    geohash TEXT NOT NULL,
+    last_seen REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS places_geohash ON places (geohash);
+CREATE TABLE IF NOT EXISTS place_keywords (
+    keyword TEXT NOT NULL,
+    place_id TEXT NOT NULL,
+    PRIMARY KEY (keyword, place_id)
+);
+CREATE TABLE IF NOT EXISTS tiles (
+    keyword TEXT NOT NULL,
+    tile_key TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (keyword, tile_key)
+);
+"""
+
+
+class LeadStore:
+    def __init__(self, db_path: Path, tile_ttl_seconds: float):
+        self.db_path = db_path
+        self.tile_ttl_seconds = tile_ttl_seconds
+        self._lock = threading.Lock()
+        self.counters = {"fresh_tiles": 0, "stale_tiles": 0, "places_upserted": 0}
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(db_path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+
+    def upsert_places(self, keyword: str, places: List[Dict[str, Any]]) -> None:
+        """Record places returned for a keyword (places without id or location are skipped)."""
+        now = time.time()
+        keyword = normalize_key(keyword)
+        rows = []
+        for place in places:
+            location = place.get("location") or {}
+            if not place.get("id") or "latitude" not in location or "longitude" not in location:
+                continue
+            rows.append((
+                place["id"],
+                place.get("displayName", {}).get("text"),
+                place.get("nationalPhoneNumber") or place.get("internationalPhoneNumber"),
+                json.dumps(place.get("types", [])),
+                location["latitude"],
+                location["longitude"],
+                place.get("businessStatus"),
+                encode_geohash(location["latitude"], location["longitude"], PLACE_GEOHASH_PRECISION),
+                now,
+                json.dumps(place)
+            ))
+        if not rows:
+            return
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO places (id, name, phone, types, latitude, longitude, status, geohash, last_seen, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO place_keywords (keyword, place_id) VALUES (?, ?)",
+                    [(keyword, row[0]) for row in rows]
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            self.counters["places_upserted"] += len(rows)
+
+    def mark_tile(self, keyword: str, tile_key: str) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO tiles (keyword, tile_key, fetched_at) VALUES (?, ?, ?)",
+                (normalize_key(keyword), tile_key, time.time())
+            )
+
+    def tile_is_fresh(self, keyword: str, tile_key: str) -> bool:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT fetched_at FROM tiles WHERE keyword = ? AND tile_key = ?",
+                (normalize_key(keyword), tile_key)
+            ).fetchone()
+        fresh = row is not None and time.time() - row[0] <= self.tile_ttl_seconds
+        self.counters["fresh_tiles" if fresh else "stale_tiles"] += 1
+        return fresh
+
+    def query_radius(
+        self,
+        keyword: str,
+        latitude: float,
+        longitude: float,
+        radius_m: float
+    ) -> List[Dict[str, Any]]:
+        """
+        Places seen for keyword inside the bounding box of the radius (callers
+        apply the exact distance filter).
+        """
+        prefixes = geohash_cover(latitude, longitude, radius_m)
+        ranges = " OR ".join(["(p.geohash >= ? AND p.geohash < ?)"] * len(prefixes))
+        params: List[Any] = [normalize_key(keyword)]
+        for prefix in prefixes:
+            params.extend([prefix, prefix + "~"])
+
+        delta_lat, _ = radius_box(latitude, radius_m)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT p.data FROM places p JOIN place_keywords k ON k.place_id = p.id "
+                f"WHERE k.keyword = ? AND ({ranges}) AND p.latitude BETWEEN ? AND ?",
+                params + [latitude - delta_lat, latitude + delta_lat]
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            places = self._db.execute("SELECT COUNT(*) FROM places").fetchone()[0]
+            tiles = self._db.execute("SELECT COUNT(*) FROM tiles").fetchone()[0]
+        return {**self.counters, "places": places, "tiles": tiles, "tile_ttl_seconds": self.tile_ttl_seconds}
+
+
+def open_lead_store(db_path: Optional[str], tile_ttl_seconds: float) -> Optional[LeadStore]:
+    """Open the store, or return None (store disabled) if the path is empty or unusable."""
+    if not db_path:
+        return None
+    try:
+        return LeadStore(Path(db_path), tile_ttl_seconds)
+    except Exception as e:
+        logger.warning(f"Lead store unavailable: {e}")
+        return None
@@ -0,0 +1,150 @@
+"""
+Phone number normalization to E.164 digits for WhatsApp click-to-chat links.
+
+Numbers are normalized against the country of the searched location (from the
+geocode result), memoized, and rejected when they cannot be a valid number.
+"""
+
+import os
+import re
+import logging
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from dotenv import load_dotenv
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PHONE_COUNTRY = os.environ.get('DEFAULT_PHONE_COUNTRY', 'IN').upper()
+
+
+class CountryRule(NamedTuple):
+    calling_code: str
+    national_lengths: Tuple[int, ...]
+    trunk_prefix: str
+
+
+# National significant number lengths (after removing the trunk prefix)
+COUNTRY_RULES: Dict[str, CountryRule] = {
+    "IN": CountryRule("91", (10,), "0"),
+    "US": CountryRule("1", (10,), "1"),
+    "CA": CountryRule("1", (10,), "1"),
+    "GB": CountryRule("44", (9, 10), "0"),
+    "AE": CountryRule("971", (8, 9), "0"),
+    "SA": CountryRule("966", (8, 9), "0"),
+    "AU": CountryRule("61", (9,), "0"),
+    "NZ": CountryRule("64", (8, 9, 10), "0"),
+    "SG": CountryRule("65", (8,), ""),
+    "MY": CountryRule("60", (9, 10), "0"),
+    "PK": CountryRule("92", (9, 10), "0"),
+    "BD": CountryRule("880", (10,), "0"),
+    "LK": CountryRule("94", (9,), "0"),
+    "NP": CountryRule("977", (8, 10), "0"),
+    "ZA": CountryRule("27", (9,), "0"),
+    "NG": CountryRule("234", (8, 10), "0"),
+    "KE": CountryRule("254", (9,), "0"),
+    "DE": CountryRule("49", tuple(range(6, 14)), "0"),
+    "FR": CountryRule("33", (9,), "0"),
+    "ES": CountryRule("34", (9,), ""),
+    "IT": CountryRule("39", tuple(range(6, 12)), ""),
+    "NL": CountryRule("31", (9,), "0"),
+    "BR": CountryRule("55", (10, 11), "0"),
+    "MX": CountryRule("52", (10,), ""),
+}
+
+# Calling codes of countries without a full rule above. Their national numbers
+# are written with a leading 0 trunk prefix, which is dropped after the code.
+CALLING_CODES: Dict[str, str] = {
+    "JP": "81", "CN": "86", "KR": "82", "TW": "886", "ID": "62", "PH": "63",
+    "TH": "66", "VN": "84", "TR": "90", "EG": "20", "IL": "972", "IE": "353",
+    "BE": "32", "CH": "41", "AT": "43", "SE": "46", "FI": "358", "AR": "54",
+    "PE": "51", "GH": "233", "TZ": "255", "UG": "256", "ET": "251", "MA": "212",
+}
+
+# E.164 allows at most 15 digits; anything under 8 is not a reachable number
+E164_MIN_DIGITS = 8
+E164_MAX_DIGITS = 15
+
+_NON_DIGITS = re.compile(r'\D')
+
+
+@lru_cache(maxsize=65536)
+def normalize_phone(phone: str, country_code: str = DEFAULT_PHONE_COUNTRY) -> Optional[str]:
+    """
+    Normalize a phone number to E.164 digits (no leading '+'), or None if it
+    cannot be a valid number for the given ISO country.
+    """
+    if not phone:
+        return None
+    raw = phone.strip()
+    digits = _NON_DIGITS.sub('', raw)
+    country = (country_code or DEFAULT_PHONE_COUNTRY).upper()
+    rule = COUNTRY_RULES.get(country)
+
+    # Already international: +CC... or 00CC...
+    if raw.startswith('+') or digits.startswith('00'):
+        if digits.startswith('00'):
+            digits = digits[2:]
+        return _validate_international(digits)
+
+    if rule is None:
+        if digits.startswith('0'):
+            # National number with a trunk prefix: it needs the country's calling code
+            calling_code = CALLING_CODES.get(country)
+            if calling_code is None:
+                return None
+            number = calling_code + digits[1:]
+            return number if E164_MIN_DIGITS <= len(number) <= E164_MAX_DIGITS else None
+        # Otherwise only accept numbers that already carry a calling code
+        return _validate_international(digits)
+
+    if rule.trunk_prefix and digits.startswith(rule.trunk_prefix):
+        national = digits[len(rule.trunk_prefix):]
+        if len(national) in rule.national_lengths:
+            return rule.calling_code + national
+    # A national number never starts with the trunk prefix once it is dropped
+    if len(digits) in rule.national_lengths and not (rule.trunk_prefix and digits.startswith(rule.trunk_prefix)):
+        return rule.calling_code + digits
+    if digits.startswith(rule.calling_code):
+        national = digits[len(rule.calling_code):]
+        # Tolerate a trunk prefix written after the calling code (91 0XXXXXXXXX)
+        if rule.trunk_prefix and national.startswith(rule.trunk_prefix) and len(national) - len(rule.trunk_prefix) in rule.national_lengths:
+            national = national[len(rule.trunk_prefix):]
+        if len(national) in rule.national_lengths:
+            return rule.calling_code + national
+    return None
+
+
+def _validate_international(digits: str) -> Optional[str]:
+    # No calling code starts with 0, so these are national numbers
+    if digits.startswith('0') or not E164_MIN_DIGITS <= len(digits) <= E164_MAX_DIGITS:
+        return None
+    for rule in COUNTRY_RULES.values():
+        if digits.startswith(rule.calling_code):
+            national = digits[len(rule.calling_code):]
+            if len(national) in rule.national_lengths:
+                return digits
+    # Calling code not in our table: accept on length alone
+    if not any(digits.startswith(rule.calling_code) for rule in COUNTRY_RULES.values()):
+        return digits
+    return None
+
+
+def normalize_phones(phones: Iterable[str], country_code: str = DEFAULT_PHONE_COUNTRY) -> List[Optional[str]]:
+    """Normalize a batch of numbers; duplicates within the batch are normalized once."""
+    country_code = (country_code or DEFAULT_PHONE_COUNTRY).upper()
+    seen: Dict[str, Optional[str]] = {}
+    results = []
+    for phone in phones:
+        if phone not in seen:
+            seen[phone] = normalize_phone(phone or "", country_code)
+        results.append(seen[phone])
+    return results
+
+
+def phone_cache_stats() -> Dict[str, int]:
+    info = normalize_phone.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize}
@@ -0,0 +1,167 @@
+"""
+Background AI pitch upgrades.
+
+A search can answer immediately with template pitches and hand back a job id;
+the AI pitches are generated here in the background and can be polled or
+streamed as they complete.
+"""
+
+import os
+import time
+import uuid
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional
+from dotenv import load_dotenv
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+from lead_service import AI_PITCH_BATCH_SIZE, lead_service
+
+logger = logging.getLogger(__name__)
+
+PITCH_JOB_TTL_SECONDS = float(os.environ.get('PITCH_JOB_TTL_SECONDS', '3600'))
+PITCH_JOB_MAX_JOBS = int(os.environ.get('PITCH_JOB_MAX_JOBS', '1000'))
+
+
+class PitchJob:
+    def __init__(self, leads: List[Dict[str, Any]]):
+        self.id = uuid.uuid4().hex
+        self.status = "pending"
+        self.total = len(leads)
+        self.updates: List[Dict[str, Any]] = []
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "failed", "cancelled")
+
+    def add_updates(self, updates: List[Dict[str, Any]]) -> None:
+        self.updates.extend(updates)
+        self._notify()
+
+    def finish(self, status: str, error: Optional[str] = None) -> None:
+        self.status = status
+        self.error = error
+        self.finished_at = time.time()
+        self._notify()
+
+    def _notify(self) -> None:
+        # Wake current waiters and arm a fresh event for the next change
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def to_dict(self, since: int = 0) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "total": self.total,
+            "completed": len(self.updates),
+            "error": self.error,
+            "pitches": self.updates[since:]
+        }
+
+    async def iter_updates(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield each pitch update as it lands, until the job finishes."""
+        position = 0
+        while True:
+            changed = self._changed
+            while position < len(self.updates):
+                yield self.updates[position]
+                position += 1
+            if self.done:
+                return
+            await changed.wait()
+
+
+class PitchJobManager:
+    def __init__(self):
+        self._jobs: "OrderedDict[str, PitchJob]" = OrderedDict()
+
+    def submit(
+        self,
+        leads: List[Dict[str, Any]],
+        user_business_name: str,
+        user_core_offering: str,
+        country_code: Optional[str] = None
+    ) -> PitchJob:
+        """Start upgrading the pitches of leads (indexes refer to this list)."""
+        self._prune()
+        job = PitchJob(leads)
+        self._jobs[job.id] = job
+        job.task = asyncio.create_task(
+            self._run(job, leads, user_business_name, user_core_offering, country_code)
+        )
+        return job
+
+    def get(self, job_id: str) -> Optional[PitchJob]:
+        return self._jobs.get(job_id)
+
+    async def shutdown(self) -> None:
+        for job in self._jobs.values():
+            if job.task is not None and not job.task.done():
+                job.task.cancel()
+
+    async def _run(
+        self,
+        job: PitchJob,
+        leads: List[Dict[str, Any]],
+        user_business_name: str,
+        user_core_offering: str,
+        country_code: Optional[str]
+    ) -> None:
+        job.status = "running"
+        batch_size = max(1, AI_PITCH_BATCH_SIZE)
+
+        async def run_chunk(start: int) -> None:
+            chunk = leads[start:start + batch_size]
+            processed = await lead_service.process_leads(
+                chunk,
+                user_business_name,
+                user_core_offering,
+                use_ai_pitch=True,
+                country_code=country_code
+            )
+            job.add_updates([
+                {
+                    "index": start + offset,
+                    "power_pitch": lead["power_pitch"],
+                    "whatsapp_link": lead["whatsapp_link"]
+                }
+                for offset, lead in enumerate(processed)
+            ])
+
+        try:
+            await asyncio.gather(*[run_chunk(start) for start in range(0, len(leads), batch_size)])
+            job.finish("completed")
+        except asyncio.CancelledError:
+            job.finish("cancelled")
+            raise
+        except Exception as e:
+            logger.error(f"AI pitch job {job.id} failed: {str(e)}")
+            job.finish("failed", str(e))
+
+    def _prune(self) -> None:
+        now = time.time()
+        for job_id in list(self._jobs):
+            job = self._jobs[job_id]
+            if job.done and now - job.finished_at > PITCH_JOB_TTL_SECONDS:
+                del self._jobs[job_id]
+        while len(self._jobs) >= PITCH_JOB_MAX_JOBS:
+            job_id, job = self._jobs.popitem(last=False)
+            if job.task is not None and not job.task.done():
+                job.task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        running = sum(1 for job in self._jobs.values() if not job.done)
+        return {"jobs": len(self._jobs), "running": running}
+
+
+pitch_job_manager = PitchJobManager()
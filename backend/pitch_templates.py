@@ -0,0 +1,154 @@
+"""
+Precompiled pitch templates for the non-AI pitch path.
+
+Templates are grouped by language and industry category, compiled once at
+startup and picked deterministically per target business. Each template keeps
+its static text pre-URL-encoded so WhatsApp links only encode the variable parts.
+"""
+
+import os
+import json
+import zlib
+import logging
+import datetime
+import urllib.parse
+from string import Formatter
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LANGUAGE = "en"
+DEFAULT_CATEGORY = "default"
+
+# Placeholders: {target_business_name}, {user_business_name}, {user_core_offering},
+# {target_industry}, {year}
+PITCH_TEMPLATES: Dict[str, Dict[str, List[str]]] = {
+    "en": {
+        "default": [
+            "Hi {target_business_name} team, Greetings From {user_business_name}. We are veterans specializing in {user_core_offering}. We offer premium service with world-class products that fit your needs. Can we share our {year} Price List/Portfolio?",
+            "Hi {target_business_name} team, this is {user_business_name}. We specialize in {user_core_offering} for businesses like yours, with premium quality and reliable service. Would you like to see our {year} Price List/Portfolio?",
+            "Hi {target_business_name} team, Greetings From {user_business_name}. Many {target_industry} businesses trust us for {user_core_offering}. May we send you our {year} Price List/Portfolio?",
+        ],
+        "food": [
+            "Hi {target_business_name} team, Greetings From {user_business_name}. We help restaurants and cafes with {user_core_offering}, so your kitchen and guests get the best. Can we share our {year} Price List/Portfolio?",
+            "Hi {target_business_name} team, this is {user_business_name}. We specialize in {user_core_offering} for food businesses and know how busy service gets. Would you like our {year} Price List/Portfolio?",
+        ],
+        "beauty": [
+            "Hi {target_business_name} team, Greetings From {user_business_name}. We work with salons and spas on {user_core_offering} that your clients will notice. Can we share our {year} Price List/Portfolio?",
+            "Hi {target_business_name} team, this is {user_business_name}. We specialize in {user_core_offering} for beauty businesses. Would you like to see our {year} Price List/Portfolio?",
+        ],
+        "fitness": [
+            "Hi {target_business_name} team, Greetings From {user_business_name}. We provide {user_core_offering} for gyms and studios that care about member experience. Can we share our {year} Price List/Portfolio?",
+        ],
+        "health": [
+            "Hi {target_business_name} team, Greetings From {user_business_name}. We specialize in {user_core_offering} for clinics and healthcare providers, with dependable quality. Can we share our {year} Price List/Portfolio?",
+        ],
+        "retail": [
+            "Hi {target_business_name} team, Greetings From {user_business_name}. We help stores with {user_core_offering} that keeps customers coming back. Can we share our {year} Price List/Portfolio?",
+        ],
+    },
+    "hi": {
+        "default": [
+            "Namaste {target_business_name} team, {user_business_name} ki taraf se shubhkamnayein. Hum {user_core_offering} mein experts hain aur aapki zaroorat ke hisaab se premium service dete hain. Kya hum aapko apni {year} Price List/Portfolio bhej sakte hain?",
+            "Namaste {target_business_name} team, hum {user_business_name} se hain. {target_industry} businesses ke liye hum {user_core_offering} provide karte hain. Kya aap hamari {year} Price List/Portfolio dekhna chahenge?",
+        ],
+    },
+}
+
+# Industry strings (Places types, title-cased) are mapped to a category by keyword
+INDUSTRY_CATEGORIES: List[Tuple[str, Tuple[str, ...]]] = [
+    ("beauty", ("salon", "beauty", "spa", "hair", "nail", "barber")),
+    ("food", ("restaurant", "cafe", "bakery", "food", "bar", "meal", "catering")),
+    ("fitness", ("gym", "fitness", "yoga", "sports")),
+    ("health", ("hospital", "clinic", "doctor", "dentist", "pharmacy", "health", "physiotherap")),
+    ("retail", ("store", "shop", "supermarket", "boutique", "market")),
+]
+
+
+class RenderedPitch(NamedTuple):
+    text: str
+    encoded: str
+
+
+class CompiledTemplate:
+    def __init__(self, template: str):
+        self.template = template
+        # (literal, field) pairs; static literals are URL-encoded once here
+        self.parts: List[Tuple[str, Optional[str]]] = [
+            (literal, field) for literal, field, _, _ in Formatter().parse(template)
+        ]
+        self.encoded_literals = [urllib.parse.quote(literal) for literal, _ in self.parts]
+
+    def render(self, values: Dict[str, str]) -> RenderedPitch:
+        text = []
+        encoded = []
+        for (literal, field), encoded_literal in zip(self.parts, self.encoded_literals):
+            text.append(literal)
+            encoded.append(encoded_literal)
+            if field is not None:
+                value = values.get(field, "")
+                text.append(value)
+                encoded.append(urllib.parse.quote(value))
+        return RenderedPitch("".join(text), "".join(encoded))
+
+
+class PitchTemplateEngine:
+    def __init__(self, templates: Dict[str, Dict[str, List[str]]]):
+        self.templates: Dict[str, Dict[str, List[CompiledTemplate]]] = {
+            language: {
+                category: [CompiledTemplate(template) for template in variants]
+                for category, variants in categories.items() if variants
+            }
+            for language, categories in templates.items()
+        }
+        count = sum(len(v) for categories in self.templates.values() for v in categories.values())
+        logger.info(f"Compiled {count} pitch templates for languages: {', '.join(self.templates)}")
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "PitchTemplateEngine":
+        """Built-in templates, overridden per language/category by a JSON file if given."""
+        templates = {language: dict(categories) for language, categories in PITCH_TEMPLATES.items()}
+        if path:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    for language, categories in json.load(f).items():
+                        templates.setdefault(language, {}).update(categories)
+            except Exception as e:
+                logger.error(f"Failed to load pitch templates from {path}: {e}")
+        return cls(templates)
+
+    def categorize(self, target_industry: str) -> str:
+        industry = (target_industry or "").lower()
+        for category, keywords in INDUSTRY_CATEGORIES:
+            if any(keyword in industry for keyword in keywords):
+                return category
+        return DEFAULT_CATEGORY
+
+    def select(self, target_business_name: str, target_industry: str, language: str = DEFAULT_LANGUAGE) -> CompiledTemplate:
+        """Pick a template deterministically: the same target always gets the same variant."""
+        categories = self.templates.get(language) or self.templates[DEFAULT_LANGUAGE]
+        variants = categories.get(self.categorize(target_industry)) or categories.get(DEFAULT_CATEGORY)
+        if not variants:
+            variants = self.templates[DEFAULT_LANGUAGE][DEFAULT_CATEGORY]
+        index = zlib.crc32(target_business_name.lower().encode("utf-8")) % len(variants)
+        return variants[index]
+
+    def render(
+        self,
+        user_business_name: str,
+        user_core_offering: str,
+        target_business_name: str,
+        target_industry: str,
+        language: str = DEFAULT_LANGUAGE
+    ) -> RenderedPitch:
+        template = self.select(target_business_name, target_industry, language)
+        return template.render({
+            "target_business_name": target_business_name,
+            "user_business_name": user_business_name,
+            "user_core_offering": user_core_offering,
+            "target_industry": target_industry,
+            "year": str(datetime.date.today().year),
+        })
+
+
+pitch_template_engine = PitchTemplateEngine.load(os.environ.get('PITCH_TEMPLATES_PATH'))
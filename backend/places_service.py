@@ -1,27 +1,235 @@
 import os
-import requests
+import math
+import heapq
+import asyncio
+import httpx
 import logging
-from typing import List, Dict, Any, Optional
+import numpy as np
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 from dotenv import load_dotenv
 from pathlib import Path
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+from cache_store import CACHE_DIR, TieredCache, normalize_key
+from geo_utils import encode_geohash, decode_geohash, radius_box, geohash_error_m, hex_tile_centers, offset_coordinates
+from single_flight import SingleFlight
+from lead_store import open_lead_store
+
 logger = logging.getLogger(__name__)
 
+GEOCODE_URL = "https://maps.googleapis.com/maps/api/geocode/json"
+PLACES_FIELD_MASK = "places.id,places.displayName,places.formattedAddress,places.nationalPhoneNumber,places.internationalPhoneNumber,places.types,places.location,places.businessStatus,nextPageToken"
+
+# Text Search returns at most 20 places per page and 60 per query
+PAGE_SIZE_LIMIT = 20
+MAX_SEARCH_RESULTS = 60
+
+EARTH_RADIUS_KM = 6371
+
+# Shared HTTP client tuning (keep-alive pool reused across requests)
+HTTP_MAX_CONNECTIONS = int(os.environ.get('PLACES_HTTP_MAX_CONNECTIONS', '50'))
+HTTP_MAX_KEEPALIVE = int(os.environ.get('PLACES_HTTP_MAX_KEEPALIVE', '20'))
+HTTP_KEEPALIVE_EXPIRY = float(os.environ.get('PLACES_HTTP_KEEPALIVE_EXPIRY', '30'))
+
+# Geocode cache (in-process LRU + SQLite so results survive restarts)
+GEOCODE_CACHE_TTL_SECONDS = float(os.environ.get('GEOCODE_CACHE_TTL_SECONDS', str(30 * 24 * 3600)))
+GEOCODE_CACHE_MAX_ENTRIES = int(os.environ.get('GEOCODE_CACHE_MAX_ENTRIES', '2048'))
+GEOCODE_CACHE_PATH = os.environ.get('GEOCODE_CACHE_PATH', str(CACHE_DIR / 'geocode.sqlite3'))
+
+# Places search result cache, keyed by (keyword, geohash tile, radius bucket).
+# Entries older than the TTL are still served for the stale window while a
+# background task refreshes them.
+SEARCH_CACHE_TTL_SECONDS = float(os.environ.get('SEARCH_CACHE_TTL_SECONDS', str(6 * 3600)))
+SEARCH_CACHE_STALE_SECONDS = float(os.environ.get('SEARCH_CACHE_STALE_SECONDS', str(7 * 24 * 3600)))
+SEARCH_CACHE_MAX_ENTRIES = int(os.environ.get('SEARCH_CACHE_MAX_ENTRIES', '1024'))
+SEARCH_CACHE_PATH = os.environ.get('SEARCH_CACHE_PATH', str(CACHE_DIR / 'places_search.sqlite3'))
+SEARCH_CACHE_GEOHASH_PRECISION = int(os.environ.get('SEARCH_CACHE_GEOHASH_PRECISION', '6'))
+RADIUS_BUCKETS_M = (500, 1000, 1500, 2000, 3000, 5000, 7500, 10000, 15000, 20000, 30000, 50000)
+
+# Coverage mode: split the search radius into hexagonal tiles queried concurrently
+FANOUT_TILE_RADIUS_M = float(os.environ.get('PLACES_FANOUT_TILE_RADIUS_M', '2000'))
+FANOUT_MAX_TILES = int(os.environ.get('PLACES_FANOUT_MAX_TILES', '61'))
+FANOUT_CONCURRENCY = int(os.environ.get('PLACES_FANOUT_CONCURRENCY', '8'))
+
+# Local store of every place seen; coverage searches only call Google for
+# tiles not fetched within the tile TTL
+LEAD_STORE_PATH = os.environ.get('LEAD_STORE_PATH', str(CACHE_DIR / 'leads.sqlite3'))
+LEAD_STORE_TILE_TTL_SECONDS = float(os.environ.get('LEAD_STORE_TILE_TTL_SECONDS', str(7 * 24 * 3600)))
+
+# Batch (locations x keywords) searches share one concurrency budget
+BATCH_SEARCH_CONCURRENCY = int(os.environ.get('LEAD_BATCH_CONCURRENCY', '8'))
+
+
+class _PageStream:
+    """Pages of one in-flight search, readable by every request waiting on it."""
+
+    def __init__(self):
+        self.pages: List[List[Dict[str, Any]]] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self._changed = asyncio.Event()
+
+    def push(self, page: List[Dict[str, Any]]) -> None:
+        self.pages.append(page)
+        self._notify()
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.done = True
+        self.error = error
+        self._notify()
+
+    def _notify(self) -> None:
+        # Wake current readers; later waits use a fresh event
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def iter_pages(self) -> AsyncIterator[List[Dict[str, Any]]]:
+        position = 0
+        while True:
+            changed = self._changed
+            while position < len(self.pages):
+                yield self.pages[position]
+                position += 1
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            await changed.wait()
+
+
 class PlacesService:
     def __init__(self):
         self.api_key = os.environ.get('GOOGLE_PLACES_API_KEY')
         self.base_url = "https://places.googleapis.com/v1"
-        
-    def geocode_location(self, location: str) -> Optional[Dict[str, float]]:
+        self._client: Optional[httpx.AsyncClient] = None
+        self.geocode_cache = TieredCache(
+            "geocode",
+            max_entries=GEOCODE_CACHE_MAX_ENTRIES,
+            ttl_seconds=GEOCODE_CACHE_TTL_SECONDS,
+            db_path=Path(GEOCODE_CACHE_PATH) if GEOCODE_CACHE_PATH else None
+        )
+        self.search_cache = TieredCache(
+            "places_search",
+            max_entries=SEARCH_CACHE_MAX_ENTRIES,
+            ttl_seconds=SEARCH_CACHE_TTL_SECONDS,
+            db_path=Path(SEARCH_CACHE_PATH) if SEARCH_CACHE_PATH else None,
+            retention_seconds=SEARCH_CACHE_TTL_SECONDS + SEARCH_CACHE_STALE_SECONDS
+        )
+        self.lead_store = open_lead_store(LEAD_STORE_PATH, LEAD_STORE_TILE_TTL_SECONDS)
+        self._refresh_tasks: Dict[str, asyncio.Task] = {}
+        self._page_streams: Dict[str, _PageStream] = {}
+        # Concurrent identical upstream calls share one in-flight request
+        self._geocode_flight = SingleFlight("places.geocode")
+        self._search_flight = SingleFlight("places.search")
+        self.search_counters = {"stale_served": 0, "refreshes": 0, "refresh_failures": 0, "stream_joins": 0}
+
+    async def startup(self) -> None:
+        """Create the shared pooled HTTP client. Called once on app startup."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                    keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+                ),
+                timeout=httpx.Timeout(15.0, connect=5.0)
+            )
+            logger.info("Places HTTP client started")
+
+    async def shutdown(self) -> None:
+        """Close the shared HTTP client. Called once on app shutdown."""
+        for task in list(self._refresh_tasks.values()):
+            task.cancel()
+        self._refresh_tasks.clear()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            logger.info("Places HTTP client closed")
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        # Lazily start the client when used outside the app lifespan (scripts, tests)
+        if self._client is None:
+            await self.startup()
+        return self._client
+
+    def _parse_geocode_response(self, location: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if data.get("status") == "OK" and data.get("results"):
+            result = data["results"][0]
+            location_data = result["geometry"]["location"]
+            coordinates = {
+                "latitude": location_data["lat"],
+                "longitude": location_data["lng"]
+            }
+            # ISO country of the location, used to normalize phone numbers
+            for component in result.get("address_components", []):
+                if "country" in component.get("types", []):
+                    coordinates["country_code"] = component.get("short_name")
+                    break
+            return coordinates
+        logger.warning(f"Geocoding failed for location: {location}")
+        return None
+
+    def _build_search_payload(
+        self,
+        latitude: float,
+        longitude: float,
+        keyword: str,
+        radius: int,
+        max_results: int,
+        restrict: bool = False,
+        page_token: Optional[str] = None
+    ) -> Dict[str, Any]:
+        payload = {
+            "textQuery": keyword,
+            "pageSize": min(max_results, PAGE_SIZE_LIMIT)
+        }
+        if page_token:
+            payload["pageToken"] = page_token
+        if restrict:
+            # Only return places inside the bounding box of the circle
+            low = offset_coordinates(latitude, longitude, -radius, -radius)
+            high = offset_coordinates(latitude, longitude, radius, radius)
+            payload["locationRestriction"] = {
+                "rectangle": {
+                    "low": {"latitude": low[0], "longitude": low[1]},
+                    "high": {"latitude": high[0], "longitude": high[1]}
+                }
+            }
+        else:
+            payload["locationBias"] = {
+                "circle": {
+                    "center": {
+                        "latitude": latitude,
+                        "longitude": longitude
+                    },
+                    "radius": float(radius)
+                }
+            }
+        return payload
+
+    def _search_headers(self) -> Dict[str, str]:
+        return {
+            "Content-Type": "application/json",
+            "X-Goog-Api-Key": self.api_key or "",
+            "X-Goog-FieldMask": PLACES_FIELD_MASK
+        }
+
+    async def geocode_location_async(self, location: str) -> Optional[Dict[str, Any]]:
         """Convert a location string to latitude/longitude coordinates."""
-        geocode_url = "https://maps.googleapis.com/maps/api/geocode/json"
+        cache_key = normalize_key(location)
+        cached = self.geocode_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
+        return await self._geocode_flight.do(cache_key, lambda: self._fetch_geocode(location, cache_key))
+
+    async def _fetch_geocode(self, location: str, cache_key: str) -> Optional[Dict[str, Any]]:
         try:
-            response = requests.get(
-                geocode_url,
+            client = await self._get_client()
+            response = await client.get(
+                GEOCODE_URL,
                 params={
                     "address": location,
                     "key": self.api_key
@@ -29,69 +237,378 @@ class PlacesService:
                 timeout=10
             )
             response.raise_for_status()
-            data = response.json()
-            
-            if data.get("status") == "OK" and data.get("results"):
-                location_data = data["results"][0]["geometry"]["location"]
-                return {
-                    "latitude": location_data["lat"],
-                    "longitude": location_data["lng"]
-                }
-            logger.warning(f"Geocoding failed for location: {location}")
-            return None
+            coordinates = self._parse_geocode_response(location, response.json())
+            if coordinates:
+                self.geocode_cache.set(cache_key, coordinates)
+            return coordinates
             
         except Exception as e:
             logger.error(f"Error geocoding location: {str(e)}")
             return None
     
-    def search_nearby(
+    def search_cache_key(
+        self,
+        latitude: float,
+        longitude: float,
+        keyword: str,
+        radius: int,
+        max_results: int,
+        restrict: bool = False
+    ) -> str:
+        """Cache key for a search: normalized keyword, geohash tile of the center, radius bucket."""
+        tile = encode_geohash(latitude, longitude, SEARCH_CACHE_GEOHASH_PRECISION)
+        mode = "restrict" if restrict else "bias"
+        return f"{normalize_key(keyword)}|{tile}|{self._radius_bucket(radius)}|{max_results}|{mode}"
+
+    def plan_page_size(self, max_results: int) -> int:
+        """Page size that fetches max_results in the fewest round trips without over-fetching."""
+        max_results = max(1, min(max_results, MAX_SEARCH_RESULTS))
+        pages = math.ceil(max_results / PAGE_SIZE_LIMIT)
+        return math.ceil(max_results / pages)
+
+    def _radius_bucket(self, radius: int) -> int:
+        for bucket in RADIUS_BUCKETS_M:
+            if radius <= bucket:
+                return bucket
+        return int(radius)
+
+    async def search_nearby_async(
         self,
         latitude: float,
         longitude: float,
         keyword: str,
         radius: int = 5000,
-        max_results: int = 20
+        max_results: int = 20,
+        restrict: bool = False
     ) -> List[Dict[str, Any]]:
         """
         Search for businesses near a location using Text Search.
+
+        Results are cached per (keyword, geohash tile, radius bucket); the upstream
+        call uses the tile center and bucket radius so every search that maps to
+        the same key would get the same answer. Stale entries are served
+        immediately and refreshed in the background.
         """
-        url = f"{self.base_url}/places:searchText"
+        cache_key = self.search_cache_key(latitude, longitude, keyword, radius, max_results, restrict)
+        tile_lat, tile_lng = decode_geohash(cache_key.split("|")[1])
+        bucket = self._radius_bucket(radius)
         
-        payload = {
-            "textQuery": keyword,
-            "locationBias": {
-                "circle": {
-                    "center": {
-                        "latitude": latitude,
-                        "longitude": longitude
-                    },
-                    "radius": float(radius)
-                }
-            },
-            "maxResultCount": min(max_results, 20)
-        }
+        entry = self.search_cache.get_entry(
+            cache_key,
+            max_age=SEARCH_CACHE_TTL_SECONDS + SEARCH_CACHE_STALE_SECONDS
+        )
+        if entry is not None:
+            if entry.age > SEARCH_CACHE_TTL_SECONDS:
+                self.search_counters["stale_served"] += 1
+                self._schedule_refresh(cache_key, tile_lat, tile_lng, keyword, bucket, max_results, restrict)
+            return entry.value
         
-        headers = {
-            "Content-Type": "application/json",
-            "X-Goog-Api-Key": self.api_key,
-            "X-Goog-FieldMask": "places.id,places.displayName,places.formattedAddress,places.nationalPhoneNumber,places.internationalPhoneNumber,places.types,places.location,places.businessStatus"
-        }
+        return await self._search_flight.do(
+            cache_key,
+            lambda: self._fetch_and_cache(cache_key, tile_lat, tile_lng, keyword, bucket, max_results, restrict)
+        )
+
+    async def search_coverage(
+        self,
+        latitude: float,
+        longitude: float,
+        keyword: str,
+        radius: int = 5000,
+        concurrency: int = FANOUT_CONCURRENCY
+    ) -> List[Dict[str, Any]]:
+        """
+        Cover the whole radius by splitting it into hexagonal tiles, searching
+        them concurrently and merging the results (deduped by place id, nearest first).
+        
+        With the lead store enabled, tiles fetched within the tile TTL are
+        answered from local data and only stale or missing tiles call Google.
+        """
+        tile_radius = FANOUT_TILE_RADIUS_M
+        tiles = hex_tile_centers(latitude, longitude, radius, tile_radius)
+        while len(tiles) > FANOUT_MAX_TILES:
+            tile_radius *= 1.2
+            tiles = hex_tile_centers(latitude, longitude, radius, tile_radius)
+        
+        # Cached searches snap the tile center to its geohash cell; widen each
+        # tile by that error so neighbouring tiles still overlap
+        query_radius = int(min(tile_radius, radius) + geohash_error_m(SEARCH_CACHE_GEOHASH_PRECISION))
+        tile_keys = [
+            self.search_cache_key(center[0], center[1], keyword, query_radius, PAGE_SIZE_LIMIT, restrict=True)
+            for center in tiles
+        ]
+        pending = [
+            (center, tile_key) for center, tile_key in zip(tiles, tile_keys)
+            if self.lead_store is None or not self.lead_store.tile_is_fresh(keyword, tile_key)
+        ]
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        
+        async def search_tile(center, tile_key):
+            async with semaphore:
+                places = await self.search_nearby_async(
+                    center[0], center[1], keyword, query_radius, max_results=PAGE_SIZE_LIMIT, restrict=True
+                )
+            if self.lead_store is not None:
+                self.lead_store.upsert_places(keyword, places)
+                self.lead_store.mark_tile(keyword, tile_key)
+            return places
+        
+        results = await asyncio.gather(
+            *[search_tile(center, tile_key) for center, tile_key in pending],
+            return_exceptions=True
+        )
+        failures = [r for r in results if isinstance(r, Exception)]
+        all_failed = bool(failures) and len(failures) == len(results)
+        if all_failed and self.lead_store is None:
+            raise failures[0]
+        if failures:
+            logger.warning(f"{len(failures)} of {len(pending)} coverage tiles failed for keyword: {keyword}")
+        
+        merged: Dict[str, Dict[str, Any]] = {}
+        if self.lead_store is not None:
+            for place in self.lead_store.query_radius(keyword, latitude, longitude, radius):
+                merged[place["id"]] = place
+        # An upstream outage is an error unless stored places can still answer
+        if all_failed and not merged:
+            raise failures[0]
+        for places in results:
+            if isinstance(places, Exception):
+                continue
+            for place in places:
+                place_id = place.get("id") or f"{place.get('displayName', {}).get('text')}|{place.get('formattedAddress')}"
+                merged.setdefault(place_id, place)
+        
+        places = list(merged.values())
+        place_lats, place_lngs = self._place_coordinates(places)
+        distances = self.calculate_distances(latitude, longitude, place_lats, place_lngs)
+        places = [places[i] for i in np.argsort(distances, kind="stable")]
+        logger.info(
+            f"Coverage search found {len(places)} unique places for keyword: {keyword} "
+            f"({len(pending)} of {len(tiles)} tiles fetched upstream)"
+        )
+        return places
+
+    async def geocode_many(self, locations: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Geocode several locations concurrently, once per distinct normalized location."""
+        unique: Dict[str, str] = {}
+        for location in locations:
+            unique.setdefault(normalize_key(location), location)
+        results = await asyncio.gather(*[self.geocode_location_async(location) for location in unique.values()])
+        by_key = dict(zip(unique, results))
+        return {location: by_key[normalize_key(location)] for location in locations}
+
+    async def search_batch(
+        self,
+        centers: List[Tuple[float, float]],
+        keywords: List[str],
+        radius: int = 5000,
+        max_results: int = 20,
+        coverage: bool = False,
+        concurrency: int = BATCH_SEARCH_CONCURRENCY
+    ) -> List[List[Any]]:
+        """
+        Run every (center, keyword) search concurrently under one budget.
+
+        Returns results[i][j] for centers[i] and keywords[j]: a list of places,
+        or the exception that search raised.
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        
+        async def search(center, keyword):
+            async with semaphore:
+                if coverage:
+                    # Tiles run one at a time so the batch budget bounds upstream calls
+                    return await self.search_coverage(center[0], center[1], keyword, radius, concurrency=1)
+                return await self.search_nearby_async(center[0], center[1], keyword, radius, max_results)
+        
+        flat = await asyncio.gather(
+            *[search(center, keyword) for center in centers for keyword in keywords],
+            return_exceptions=True
+        )
+        return [flat[i * len(keywords):(i + 1) * len(keywords)] for i in range(len(centers))]
+
+    def _schedule_refresh(
+        self,
+        cache_key: str,
+        latitude: float,
+        longitude: float,
+        keyword: str,
+        radius: int,
+        max_results: int,
+        restrict: bool = False
+    ) -> None:
+        if cache_key in self._refresh_tasks:
+            return
+        
+        async def refresh():
+            try:
+                await self._search_flight.do(
+                    cache_key,
+                    lambda: self._fetch_and_cache(cache_key, latitude, longitude, keyword, radius, max_results, restrict)
+                )
+                self.search_counters["refreshes"] += 1
+            except Exception as e:
+                self.search_counters["refresh_failures"] += 1
+                logger.warning(f"Background refresh failed for {cache_key}: {str(e)}")
+        
+        task = asyncio.create_task(refresh())
+        self._refresh_tasks[cache_key] = task
+        task.add_done_callback(lambda _: self._refresh_tasks.pop(cache_key, None))
+
+    async def _fetch_and_cache(
+        self,
+        cache_key: str,
+        latitude: float,
+        longitude: float,
+        keyword: str,
+        radius: int,
+        max_results: int,
+        restrict: bool = False
+    ) -> List[Dict[str, Any]]:
+        places = await self._fetch_places(latitude, longitude, keyword, radius, max_results, restrict)
+        self.search_cache.set(cache_key, places)
+        return places
+
+    async def _fetch_places(
+        self,
+        latitude: float,
+        longitude: float,
+        keyword: str,
+        radius: int,
+        max_results: int,
+        restrict: bool = False
+    ) -> List[Dict[str, Any]]:
+        max_results = min(max_results, MAX_SEARCH_RESULTS)
+        page_size = self.plan_page_size(max_results)
+        places = []
+        page_token = None
+        
+        while True:
+            page, page_token = await self._fetch_page(
+                latitude, longitude, keyword, radius, page_size, restrict, page_token
+            )
+            places.extend(page)
+            if len(places) >= max_results or not page_token:
+                break
+        
+        logger.info(f"Found {len(places)} places for keyword: {keyword}")
+        return places[:max_results]
+
+    async def _fetch_page(
+        self,
+        latitude: float,
+        longitude: float,
+        keyword: str,
+        radius: int,
+        page_size: int,
+        restrict: bool = False,
+        page_token: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        url = f"{self.base_url}/places:searchText"
+        payload = self._build_search_payload(latitude, longitude, keyword, radius, page_size, restrict, page_token)
         
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=15)
+            client = await self._get_client()
+            response = await client.post(url, json=payload, headers=self._search_headers(), timeout=15)
             response.raise_for_status()
             
             data = response.json()
-            places = data.get("places", [])
-            logger.info(f"Found {len(places)} places for keyword: {keyword}")
-            return places
+            return data.get("places", []), data.get("nextPageToken")
             
-        except requests.exceptions.HTTPError as e:
+        except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error from Places API: {e.response.status_code} - {e.response.text}")
             raise
         except Exception as e:
             logger.error(f"Error searching nearby places: {str(e)}")
             raise
+
+    async def iter_search_pages(
+        self,
+        latitude: float,
+        longitude: float,
+        keyword: str,
+        radius: int = 5000,
+        max_results: int = 20
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Yield search results page by page, prefetching the next page while the
+        caller processes the current one. A cached result is yielded as one page;
+        concurrent identical searches share one upstream fetch.
+        """
+        max_results = min(max_results, MAX_SEARCH_RESULTS)
+        cache_key = self.search_cache_key(latitude, longitude, keyword, radius, max_results)
+        tile_lat, tile_lng = decode_geohash(cache_key.split("|")[1])
+        bucket = self._radius_bucket(radius)
+        
+        entry = self.search_cache.get_entry(
+            cache_key,
+            max_age=SEARCH_CACHE_TTL_SECONDS + SEARCH_CACHE_STALE_SECONDS
+        )
+        if entry is not None:
+            if entry.age > SEARCH_CACHE_TTL_SECONDS:
+                self.search_counters["stale_served"] += 1
+                self._schedule_refresh(cache_key, tile_lat, tile_lng, keyword, bucket, max_results)
+            yield entry.value
+            return
+        
+        # Identical concurrent searches read the pages of one shared fetch
+        stream = self._page_streams.get(cache_key)
+        if stream is None:
+            stream = _PageStream()
+            self._page_streams[cache_key] = stream
+            fetch = asyncio.ensure_future(self._search_flight.do(
+                cache_key,
+                lambda: self._fetch_pages(stream, cache_key, tile_lat, tile_lng, keyword, bucket, max_results)
+            ))
+            fetch.add_done_callback(lambda done: self._end_page_stream(cache_key, stream, done))
+        else:
+            self.search_counters["stream_joins"] += 1
+        
+        async for page in stream.iter_pages():
+            yield page
+
+    async def _fetch_pages(
+        self,
+        stream: _PageStream,
+        cache_key: str,
+        latitude: float,
+        longitude: float,
+        keyword: str,
+        radius: int,
+        max_results: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch a search page by page into stream; the next page is requested as
+        soon as the previous one lands, while readers process it.
+        """
+        page_size = self.plan_page_size(max_results)
+        collected: List[Dict[str, Any]] = []
+        page_token = None
+        while True:
+            page, page_token = await self._fetch_page(latitude, longitude, keyword, radius, page_size, page_token=page_token)
+            page = page[:max_results - len(collected)]
+            collected.extend(page)
+            stream.push(page)
+            if not page_token or len(collected) >= max_results:
+                break
+        
+        logger.info(f"Found {len(collected)} places for keyword: {keyword}")
+        self.search_cache.set(cache_key, collected)
+        if self.lead_store is not None:
+            self.lead_store.upsert_places(keyword, collected)
+        return collected
+
+    def _end_page_stream(self, cache_key: str, stream: _PageStream, fetch: asyncio.Future) -> None:
+        if self._page_streams.get(cache_key) is stream:
+            del self._page_streams[cache_key]
+        if fetch.cancelled():
+            stream.finish(asyncio.CancelledError())
+        elif fetch.exception() is not None:
+            stream.finish(fetch.exception())
+        else:
+            if not stream.pages:
+                # Joined a search_nearby_async call already in flight for the key
+                stream.push(fetch.result())
+            stream.finish()
     
     def calculate_distance(
         self,
@@ -101,9 +618,7 @@ class PlacesService:
         lng2: float
     ) -> float:
         """Calculate distance between two points in kilometers using Haversine formula."""
-        import math
-        
-        R = 6371  # Earth's radius in kilometers
+        R = EARTH_RADIUS_KM
         
         lat1_rad = math.radians(lat1)
         lat2_rad = math.radians(lat2)
@@ -116,23 +631,132 @@ class PlacesService:
         c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
         
         return round(R * c, 2)
+
+    def calculate_distances(
+        self,
+        lat1: float,
+        lng1: float,
+        lat2: np.ndarray,
+        lng2: np.ndarray
+    ) -> np.ndarray:
+        """
+        Vectorized calculate_distance from one origin to many points.
+        Rounded results are identical to calculate_distance.
+        """
+        lat2 = np.asarray(lat2, dtype=np.float64)
+        lng2 = np.asarray(lng2, dtype=np.float64)
+        if lat2.size == 0:
+            return np.empty(0, dtype=np.float64)
+        
+        lat1_rad = math.radians(lat1)
+        lat2_rad = np.radians(lat2)
+        delta_lat = np.radians(lat2 - lat1)
+        delta_lng = np.radians(lng2 - lng1)
+        
+        a = (np.sin(delta_lat / 2) ** 2 +
+             math.cos(lat1_rad) * np.cos(lat2_rad) *
+             np.sin(delta_lng / 2) ** 2)
+        c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+        km = EARTH_RADIUS_KM * c
+        distances = np.round(km, 2)
+        
+        # np.round and round() can disagree (and libm vs SIMD trig can differ
+        # by an ulp) right at a rounding boundary; redo those few in scalar code
+        scaled = km * 100
+        ambiguous = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+        for i in ambiguous:
+            distances[i] = self.calculate_distance(lat1, lng1, float(lat2[i]), float(lng2[i]))
+        
+        return distances
+
+    def bounding_box_mask(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: float,
+        lat2: np.ndarray,
+        lng2: np.ndarray
+    ) -> np.ndarray:
+        """
+        Cheap prefilter: True for points inside the lat/lng box enclosing the
+        radius (padded so places whose rounded distance equals it are kept).
+        """
+        delta_lat, delta_lng = radius_box(latitude, radius_km * 1000)
+        mask = np.abs(lat2 - latitude) <= delta_lat
+        
+        if delta_lng < 180.0:
+            # Wrap longitude difference into [-180, 180)
+            lng_diff = (lng2 - longitude + 180.0) % 360.0 - 180.0
+            mask &= np.abs(lng_diff) <= delta_lng
+        return mask
+
+    def _place_coordinates(self, places: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+        lats = np.fromiter(
+            (place.get("location", {}).get("latitude", 0) for place in places),
+            dtype=np.float64, count=len(places)
+        )
+        lngs = np.fromiter(
+            (place.get("location", {}).get("longitude", 0) for place in places),
+            dtype=np.float64, count=len(places)
+        )
+        return lats, lngs
+    
+    def filter_places(
+        self,
+        places: List[Dict[str, Any]],
+        require_phone: bool = False,
+        operational_only: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Drop places we would never pitch (no phone / not operational)."""
+        if not require_phone and not operational_only:
+            return places
+        return [
+            place for place in places
+            if (not require_phone or place.get("nationalPhoneNumber") or place.get("internationalPhoneNumber"))
+            and (not operational_only or place.get("businessStatus", "OPERATIONAL") == "OPERATIONAL")
+        ]
     
     def format_places_for_leads(
         self,
         places: List[Dict[str, Any]],
         user_lat: float,
-        user_lng: float
+        user_lng: float,
+        radius_km: Optional[float] = None,
+        limit: Optional[int] = None,
+        require_phone: bool = False,
+        operational_only: bool = False
     ) -> List[Dict[str, Any]]:
-        """Format places data for lead generation output."""
-        leads = []
+        """
+        Format places data for lead generation output, nearest first.
         
-        for place in places:
-            place_location = place.get("location", {})
-            place_lat = place_location.get("latitude", 0)
-            place_lng = place_location.get("longitude", 0)
-            
-            distance = self.calculate_distance(user_lat, user_lng, place_lat, place_lng)
-            
+        Predicates are applied first; with radius_km, places outside its bounding
+        box are dropped before distances are computed and places beyond the
+        radius afterwards. With limit, only the nearest `limit` are kept (heap
+        selection instead of a full sort).
+        """
+        places = self.filter_places(places, require_phone, operational_only)
+        place_lats, place_lngs = self._place_coordinates(places)
+        
+        if radius_km is not None and places:
+            keep = np.flatnonzero(self.bounding_box_mask(user_lat, user_lng, radius_km, place_lats, place_lngs))
+            places = [places[i] for i in keep]
+            place_lats = place_lats[keep]
+            place_lngs = place_lngs[keep]
+        
+        distances = self.calculate_distances(user_lat, user_lng, place_lats, place_lngs).tolist()
+        candidates = range(len(places))
+        if radius_km is not None:
+            candidates = [i for i in candidates if distances[i] <= radius_km]
+        
+        # Index breaks ties so equal distances keep their upstream order
+        if limit is not None and limit < len(candidates):
+            selected = heapq.nsmallest(limit, candidates, key=lambda i: (distances[i], i))
+        else:
+            selected = sorted(candidates, key=lambda i: (distances[i], i))
+        
+        leads = []
+        for i in selected:
+            place = places[i]
             phone = place.get("nationalPhoneNumber") or place.get("internationalPhoneNumber") or ""
             
             # Get primary type from types list
@@ -140,19 +764,19 @@ class PlacesService:
             industry = types[0] if types else "business"
             
             lead = {
+                "place_id": place.get("id", ""),
                 "name": place.get("displayName", {}).get("text", "Unknown Business"),
                 "address": place.get("formattedAddress", ""),
                 "phone": phone,
-                "distance_km": distance,
+                "distance_km": distances[i],
                 "industry": industry.replace("_", " ").title(),
-                "status": place.get("businessStatus", "OPERATIONAL")
+                "status": place.get("businessStatus", "OPERATIONAL"),
+                "latitude": place.get("location", {}).get("latitude"),
+                "longitude": place.get("location", {}).get("longitude")
             }
             
             leads.append(lead)
         
-        # Sort by distance
-        leads.sort(key=lambda x: x["distance_km"])
-        
         return leads
 
 
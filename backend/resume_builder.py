@@ -3,14 +3,19 @@ Resume Builder API endpoints with AI integration using Gemini 2.5 Flash
 """
 
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form
-from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, model_validator
+from typing import Optional, List, Dict, Any, Union
 import os
 import logging
-import io
 import re
 import json
+import hashlib
 from dotenv import load_dotenv
+from single_flight import SingleFlight, single_flight_stats
+from document_extractor import document_extractor
+from upload_ingest import ingest_upload
+from cache_store import TieredCache
+from pathlib import Path
 
 # Load environment variables
 load_dotenv()
@@ -19,22 +24,63 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/resume-builder", tags=["resume-builder"])
 
+# Identical concurrent prompts share one Gemini call
+gemini_flight = SingleFlight("resume.gemini")
+
+# Parse results keyed by the SHA-256 of the uploaded bytes; memory only unless a path is set
+PARSE_CACHE_MAX_ENTRIES = int(os.environ.get('PARSE_CACHE_MAX_ENTRIES', '256'))
+PARSE_CACHE_TTL_SECONDS = float(os.environ.get('PARSE_CACHE_TTL_SECONDS', str(24 * 3600)))
+PARSE_CACHE_PATH = os.environ.get('PARSE_CACHE_PATH', '')
+
+parse_cache = TieredCache(
+    "parsed_documents",
+    max_entries=PARSE_CACHE_MAX_ENTRIES,
+    ttl_seconds=PARSE_CACHE_TTL_SECONDS,
+    db_path=Path(PARSE_CACHE_PATH) if PARSE_CACHE_PATH else None
+)
+parse_flight = SingleFlight("resume.parse")
+
+# Documents referenced by id from /analyze and /optimize; memory only (they hold resume contents)
+DOCUMENT_STORE_MAX_ENTRIES = int(os.environ.get('DOCUMENT_STORE_MAX_ENTRIES', '1024'))
+DOCUMENT_STORE_TTL_SECONDS = float(os.environ.get('DOCUMENT_STORE_TTL_SECONDS', str(6 * 3600)))
+
+document_store = TieredCache(
+    "documents",
+    max_entries=DOCUMENT_STORE_MAX_ENTRIES,
+    ttl_seconds=DOCUMENT_STORE_TTL_SECONDS
+)
+
 # Pydantic Models
-class AnalyzeRequest(BaseModel):
-    resumeText: str
+class DocumentRefs(BaseModel):
+    """Resume and job description, each given as text or as a document id from /parse or /documents."""
+    resumeText: Optional[str] = None
+    resumeId: Optional[str] = None
     resumeParsed: Optional[Dict[str, Any]] = None
-    jobDescription: str
+    jobDescription: Optional[str] = None
+    jdId: Optional[str] = None
+
+    @model_validator(mode="after")
+    def require_documents(self):
+        if self.resumeText is None and not self.resumeId:
+            raise ValueError("Provide resumeText or resumeId.")
+        if self.jobDescription is None and not self.jdId:
+            raise ValueError("Provide jobDescription or jdId.")
+        return self
+
+class AnalyzeRequest(DocumentRefs):
+    pass
 
 class AnalyzeResponse(BaseModel):
     matchScore: int
     missingKeywords: List[str]
 
-class OptimizeRequest(BaseModel):
-    resumeText: str
-    resumeParsed: Optional[Dict[str, Any]] = None
-    jobDescription: str
+class OptimizeRequest(DocumentRefs):
     tone: str = "executive"
 
+class DocumentRequest(BaseModel):
+    text: str
+    type: str = "jd"
+
 class OptimizeResponse(BaseModel):
     optimizedResume: str
     coverLetter: str
@@ -42,70 +88,6 @@ class OptimizeResponse(BaseModel):
 
 
 # Helper functions
-def extract_text_from_pdf(file_bytes: bytes) -> str:
-    """Extract text from PDF file using multiple methods"""
-    text = ""
-    
-    # Try PyPDF2 first
-    try:
-        from PyPDF2 import PdfReader
-        pdf_reader = PdfReader(io.BytesIO(file_bytes))
-        for page in pdf_reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
-        text = text.strip()
-        if text and len(text) > 20:
-            logger.info(f"PyPDF2 extracted {len(text)} characters")
-            return text
-    except Exception as e:
-        logger.warning(f"PyPDF2 extraction failed: {e}")
-    
-    # Fallback to pdfplumber
-    try:
-        import pdfplumber
-        with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-        text = text.strip()
-        if text:
-            logger.info(f"pdfplumber extracted {len(text)} characters")
-            return text
-    except Exception as e:
-        logger.warning(f"pdfplumber extraction failed: {e}")
-    
-    if not text:
-        logger.error("Could not extract text from PDF with any method")
-        raise HTTPException(status_code=400, detail="Could not extract text from PDF. The file may be image-based or corrupted. Please try pasting your resume text instead.")
-
-
-def extract_text_from_docx(file_bytes: bytes) -> str:
-    """Extract text from DOCX file"""
-    try:
-        from docx import Document
-        doc = Document(io.BytesIO(file_bytes))
-        
-        # Extract text from paragraphs
-        paragraphs = [para.text for para in doc.paragraphs if para.text.strip()]
-        
-        # Also extract text from tables
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    if cell.text.strip():
-                        paragraphs.append(cell.text.strip())
-        
-        text = "\n".join(paragraphs)
-        if not text:
-            logger.warning("DOCX extraction returned empty text")
-        return text.strip()
-    except Exception as e:
-        logger.error(f"DOCX extraction error: {e}", exc_info=True)
-        raise HTTPException(status_code=400, detail=f"Failed to extract text from DOCX: {str(e)}")
-
-
 def parse_resume_text(text: str) -> Dict[str, Any]:
     """Basic parsing of resume text into structured data"""
     parsed = {
@@ -151,6 +133,12 @@ def parse_resume_text(text: str) -> Dict[str, Any]:
 
 
 async def call_gemini_ai(prompt: str, system_message: str = "") -> str:
+    """Call Gemini 2.5 Flash, coalescing identical in-flight prompts"""
+    flight_key = hashlib.sha256(f"{system_message}\x00{prompt}".encode("utf-8")).hexdigest()
+    return await gemini_flight.do(flight_key, lambda: _call_gemini_ai(prompt, system_message))
+
+
+async def _call_gemini_ai(prompt: str, system_message: str = "") -> str:
     """Call Gemini 2.5 Flash using emergentintegrations"""
     try:
         from emergentintegrations.llm.chat import LlmChat, UserMessage
@@ -176,40 +164,105 @@ async def call_gemini_ai(prompt: str, system_message: str = "") -> str:
 
 
 # API Endpoints
+@router.get("/stats")
+async def resume_builder_stats():
+    """Upstream-call counters for the resume builder."""
+    return {
+        "parse_cache": parse_cache.stats(),
+        "document_store": document_store.stats(),
+        "extraction": document_extractor.stats(),
+        "single_flight": single_flight_stats()
+    }
+
+
+def store_document(text: str, parsed: Optional[Dict[str, Any]] = None) -> str:
+    """Keep a document server-side; the id is the SHA-256 of its text, so it is stable."""
+    document_id = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    document_store.set(document_id, {"text": text, "parsed": parsed})
+    return document_id
+
+
+def _resolve_document(document_id: Optional[str], text: Optional[str], label: str) -> Dict[str, Any]:
+    if text is not None:
+        return {"text": text, "parsed": None}
+    if not document_id:
+        raise HTTPException(status_code=400, detail=f"Provide the {label} text or its document id.")
+    document = document_store.get(document_id)
+    if document is None:
+        raise HTTPException(status_code=404, detail=f"The {label} document has expired. Please upload or paste it again.")
+    return document
+
+
+def resolve_documents(request) -> None:
+    """Fill resumeText / jobDescription (and resumeParsed) from resumeId / jdId."""
+    resume = _resolve_document(request.resumeId, request.resumeText, "resume")
+    job_description = _resolve_document(request.jdId, request.jobDescription, "job description")
+    request.resumeText = resume["text"]
+    request.jobDescription = job_description["text"]
+    if request.resumeParsed is None:
+        request.resumeParsed = resume["parsed"]
+
+
+def _parse_cache_key(digest: str, fast: bool) -> str:
+    # Fast-mode text may stop early, so it is cached apart from full extractions
+    return f"{digest}:fast" if fast else digest
+
+
+async def _extract_and_parse(kind: str, source: Union[bytes, str], digest: str, fast: bool = False) -> Dict[str, Any]:
+    """Extract and parse a document, caching the result under its content hash."""
+    text = await document_extractor.extract(kind, source, fast=fast)
+    
+    if not text or len(text.strip()) < 10:
+        logger.warning(f"Extracted text is too short: {len(text) if text else 0} chars")
+        raise HTTPException(status_code=400, detail="Could not extract text from file. The file may be empty or image-based.")
+    
+    document = {"text": text, "parsed": parse_resume_text(text)}
+    parse_cache.set(_parse_cache_key(digest, fast), document)
+    return document
+
+
 @router.post("/parse")
 async def parse_document(
     file: UploadFile = File(...),
-    type: str = Form(...)
+    type: str = Form(...),
+    fastMode: bool = Form(False)
 ):
-    """Parse uploaded PDF or DOCX file"""
+    """Parse uploaded PDF or DOCX file; fastMode stops reading a long PDF once there is enough text for analysis"""
     try:
-        file_bytes = await file.read()
         filename = file.filename.lower() if file.filename else ""
         content_type = file.content_type or ""
         
-        logger.info(f"Parse request - filename: {filename}, content_type: {content_type}, size: {len(file_bytes)}")
+        # Streamed in chunks with a size cap; the file type comes from its magic bytes
+        upload = await ingest_upload(file)
         
-        # Check by filename extension or content type
-        is_pdf = filename.endswith('.pdf') or 'pdf' in content_type
-        is_docx = filename.endswith('.docx') or 'wordprocessingml' in content_type or 'msword' in content_type
+        logger.info(f"Parse request - filename: {filename}, content_type: {content_type}, size: {upload.size}, detected: {upload.kind}")
         
-        if is_pdf:
-            text = extract_text_from_pdf(file_bytes)
-        elif is_docx:
-            text = extract_text_from_docx(file_bytes)
-        else:
-            logger.warning(f"Unsupported file type - filename: {filename}, content_type: {content_type}")
-            raise HTTPException(status_code=400, detail="Unsupported file type. Please upload PDF or DOCX.")
-        
-        if not text or len(text.strip()) < 10:
-            logger.warning(f"Extracted text is too short: {len(text) if text else 0} chars")
-            raise HTTPException(status_code=400, detail="Could not extract text from file. The file may be empty or image-based.")
+        try:
+            # Same bytes, same result: repeat uploads skip extraction entirely
+            cache_key = _parse_cache_key(upload.digest, fastMode)
+            document = parse_cache.get(upload.digest)
+            if document is None and fastMode:
+                document = parse_cache.get(cache_key)
+            if document is None:
+                # Extraction runs in the worker pool, off the event loop
+                document = await parse_flight.do(
+                    cache_key,
+                    lambda: _extract_and_parse(upload.kind, upload.source, upload.digest, fastMode)
+                )
+            else:
+                logger.info(f"Parse cache hit for {upload.digest[:12]}")
+        finally:
+            upload.close()
+        text = document["text"]
         
         result = {"text": text}
         
         # If it's a resume, also parse it
         if type == "resume":
-            result["parsed"] = parse_resume_text(text)
+            result["parsed"] = document["parsed"]
+        
+        # Later /analyze and /optimize calls can send this id instead of the text
+        result["documentId"] = store_document(text, result.get("parsed"))
         
         logger.info(f"Successfully parsed file, extracted {len(text)} characters")
         return result
@@ -221,9 +274,20 @@ async def parse_document(
         raise HTTPException(status_code=500, detail=f"Failed to parse file: {str(e)}")
 
 
+@router.post("/documents")
+async def create_document(request: DocumentRequest):
+    """Store pasted text (e.g. a job description) and return its document id."""
+    text = request.text.strip()
+    if not text:
+        raise HTTPException(status_code=400, detail="Document text is empty.")
+    parsed = parse_resume_text(text) if request.type == "resume" else None
+    return {"documentId": store_document(text, parsed), "parsed": parsed}
+
+
 @router.post("/analyze", response_model=AnalyzeResponse)
 async def analyze_resume(request: AnalyzeRequest):
     """Analyze resume against job description to calculate match score"""
+    resolve_documents(request)
     try:
         prompt = f"""You are a strict ATS keyword analyzer. Compare the resume against the job description.
 
@@ -312,6 +376,7 @@ Respond in this exact JSON format ONLY, no other text or explanation:
 @router.post("/optimize", response_model=OptimizeResponse)
 async def optimize_resume(request: OptimizeRequest):
     """Optimize resume with AI and generate cover letter"""
+    resolve_documents(request)
     try:
         # Define tone-specific instructions
         tone_instructions = {
@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
@@ -6,12 +7,32 @@ import logging
 from pathlib import Path
 from lead_sniper import router as lead_sniper_router
 from resume_builder import router as resume_builder_router
+from places_service import places_service
+from pitch_jobs import pitch_job_manager
+from campaign_jobs import campaign_job_queue
+from document_extractor import document_extractor
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Shared resources are created once per process and closed on shutdown
+    await places_service.startup()
+    await campaign_job_queue.startup()
+    await document_extractor.startup()
+    try:
+        yield
+    finally:
+        await document_extractor.shutdown()
+        await campaign_job_queue.shutdown()
+        await pitch_job_manager.shutdown()
+        await places_service.shutdown()
+
+
 # Create the main app
-app = FastAPI(title="Resume Builder API")
+app = FastAPI(title="Resume Builder API", lifespan=lifespan)
 
 # Include the resume builder router
 app.include_router(resume_builder_router)
@@ -0,0 +1,116 @@
+"""
+Chunked ingestion of uploaded documents.
+
+Uploads are read in chunks, hashed as they stream, capped at a hard size
+limit and rejected on the first chunk unless its magic bytes are a PDF or a
+DOCX (zip) file. Small files stay in memory; larger ones are spooled to a
+temp file that extractors open by path (PDFs memory-mapped), so per-upload
+memory is bounded by the spool size rather than the file size.
+"""
+
+import os
+import hashlib
+import logging
+import tempfile
+from typing import Optional, Union
+from dotenv import load_dotenv
+from pathlib import Path
+from fastapi import HTTPException, UploadFile
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_MAX_BYTES = int(os.environ.get('UPLOAD_MAX_BYTES', str(10 * 1024 * 1024)))
+UPLOAD_SPOOL_BYTES = int(os.environ.get('UPLOAD_SPOOL_BYTES', str(1024 * 1024)))
+UPLOAD_CHUNK_BYTES = 64 * 1024
+
+# PDF readers accept junk before the header, so look for it in the first KB
+PDF_MAGIC = b"%PDF-"
+ZIP_MAGIC = b"PK\x03\x04"
+
+
+def sniff_document_kind(head: bytes) -> Optional[str]:
+    """'pdf' or 'docx' from the first bytes of a file, None for anything else."""
+    if PDF_MAGIC in head[:1024]:
+        return "pdf"
+    if head.startswith(ZIP_MAGIC):
+        return "docx"
+    return None
+
+
+class IngestedUpload:
+    """An upload read to the end: bytes in memory, or a temp file path once past the spool size."""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.size = 0
+        self.digest = ""
+        self.data: Optional[bytes] = None
+        self.path: Optional[str] = None
+
+    @property
+    def source(self) -> Union[bytes, str]:
+        """What extractors are handed: the bytes, or the path of the spooled file."""
+        return self.data if self.data is not None else self.path
+
+    def close(self) -> None:
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except OSError as e:
+                logger.warning(f"Could not remove spooled upload {self.path}: {e}")
+            self.path = None
+        self.data = None
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    limit = f"{max_bytes // (1024 * 1024)} MB" if max_bytes >= 1024 * 1024 else f"{max_bytes // 1024} KB"
+    return HTTPException(status_code=413, detail=f"File is too large. The limit is {limit}.")
+
+
+async def ingest_upload(file: UploadFile, max_bytes: int = UPLOAD_MAX_BYTES) -> IngestedUpload:
+    """Read an upload in chunks; raises HTTPException 413 past max_bytes, 400 for unsupported files."""
+    if file.size is not None and file.size > max_bytes:
+        raise _too_large(max_bytes)
+
+    first = await file.read(UPLOAD_CHUNK_BYTES)
+    kind = sniff_document_kind(first)
+    if kind is None:
+        logger.warning(f"Rejected upload by content - filename: {file.filename}, content_type: {file.content_type}")
+        raise HTTPException(status_code=400, detail="Unsupported file type. Please upload PDF or DOCX.")
+
+    upload = IngestedUpload(kind)
+    hasher = hashlib.sha256()
+    buffer = bytearray()
+    spool = None
+    chunk = first
+    try:
+        while chunk:
+            upload.size += len(chunk)
+            if upload.size > max_bytes:
+                raise _too_large(max_bytes)
+            hasher.update(chunk)
+            if spool is None and len(buffer) + len(chunk) > UPLOAD_SPOOL_BYTES:
+                spool = tempfile.NamedTemporaryFile(prefix="upload-", suffix=f".{kind}", delete=False)
+                upload.path = spool.name
+                spool.write(buffer)
+                buffer = bytearray()
+            if spool is not None:
+                spool.write(chunk)
+            else:
+                buffer.extend(chunk)
+            chunk = await file.read(UPLOAD_CHUNK_BYTES)
+    except BaseException:
+        if spool is not None:
+            spool.close()
+        upload.close()
+        raise
+
+    if spool is not None:
+        spool.close()
+    else:
+        upload.data = bytes(buffer)
+    upload.digest = hasher.hexdigest()
+    return upload
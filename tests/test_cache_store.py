@@ -0,0 +1,75 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import pytest
+
+import cache_store
+from cache_store import TieredCache, normalize_key
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("  Pune ,  Maharashtra ", "pune, maharashtra"),
+    ("Salon   Spa.", "salon spa"),
+    ("Koregaon Park,Pune,", "koregaon park, pune"),
+])
+def test_normalize_key(text, expected):
+    assert normalize_key(text) == expected
+
+
+def test_lru_evicts_least_recently_used():
+    cache = TieredCache("test-lru", max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["size"] == 2
+    assert stats["persistent"] is False
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_store.time, "time", lambda: now[0])
+    cache = TieredCache("test-ttl", ttl_seconds=60)
+    cache.set("k", "v")
+    now[0] += 59
+    assert cache.get("k") == "v"
+    now[0] += 2
+    assert cache.get("k") is None
+    # Stale reads are still possible with a longer max_age
+    assert cache.get_entry("k", max_age=3600).value == "v"
+
+
+def test_disk_tier_survives_a_new_instance(tmp_path):
+    db_path = tmp_path / "cache.db"
+    TieredCache("test-disk", db_path=db_path).set("pune", {"lat": 18.52, "lng": 73.85})
+
+    cache = TieredCache("test-disk", db_path=db_path)
+    assert cache.get("pune") == {"lat": 18.52, "lng": 73.85}
+    assert cache.get("pune") == {"lat": 18.52, "lng": 73.85}
+    stats = cache.stats()
+    assert stats["disk_hits"] == 1 and stats["memory_hits"] == 1
+    assert stats["hit_rate"] == 1.0
+
+    cache.delete("pune")
+    assert TieredCache("test-disk", db_path=db_path).get("pune") is None
+
+
+def test_expired_rows_are_purged_after_retention(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_store.time, "time", lambda: now[0])
+    db_path = tmp_path / "cache.db"
+
+    def open_cache():
+        return TieredCache("test-retention", ttl_seconds=60, db_path=db_path, retention_seconds=600)
+
+    open_cache().set("k", "v")
+    now[0] += 300
+    assert open_cache().get_entry("k", max_age=600).value == "v"
+    now[0] += 400
+    assert open_cache().get_entry("k", max_age=3600) is None
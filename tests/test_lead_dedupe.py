@@ -0,0 +1,103 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import pytest
+
+from geo_utils import decode_geohash, encode_geohash
+from lead_dedupe import LeadIndex, merge_lead, normalize_business_name
+
+# Center of a ~150 m geohash cell, so small offsets stay inside it
+CELL_LAT, CELL_LNG = decode_geohash(encode_geohash(18.5204, 73.8567, 7))
+
+
+def lead(name, **fields):
+    return {"name": name, "address": "", "phone": "", **fields}
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("The Glam Salon Pvt. Ltd.", "glam salon"),
+    ("GLAM  salon", "glam salon"),
+    ("Bob & Sons Co.", "bob sons"),
+    ("", ""),
+])
+def test_normalize_business_name(name, expected):
+    assert normalize_business_name(name) == expected
+
+
+def test_merges_by_place_id():
+    index = LeadIndex("IN")
+    first, is_new = index.add(lead("Glam Salon", place_id="abc"))
+    kept, is_new_again = index.add(lead("Glam Studio", place_id="abc"))
+    assert is_new and not is_new_again
+    assert kept is first
+    assert index.leads == [first]
+    assert index.duplicates == 1
+
+
+def test_merges_by_normalized_phone():
+    index = LeadIndex("IN")
+    index.add(lead("Glam Salon", place_id="a", phone="098765 43210"))
+    kept, is_new = index.add(lead("Glam Unisex Salon", place_id="b", phone="+91 98765 43210"))
+    assert not is_new
+    assert kept["place_id"] == "a"
+    assert len(index.leads) == 1
+
+
+def test_merges_by_name_in_same_geohash_cell():
+    index = LeadIndex("IN")
+    index.add(lead("Glam Salon", latitude=CELL_LAT, longitude=CELL_LNG))
+    _, same_cell = index.add(lead("The Glam Salon Pvt Ltd", latitude=CELL_LAT + 0.0001, longitude=CELL_LNG))
+    _, far_away = index.add(lead("Glam Salon", latitude=CELL_LAT + 0.05, longitude=CELL_LNG))
+    _, other_name = index.add(lead("Glow Salon", latitude=CELL_LAT, longitude=CELL_LNG))
+    assert not same_cell
+    assert far_away and other_name
+    assert len(index.leads) == 3
+
+
+def test_leads_without_keys_are_never_merged():
+    index = LeadIndex("IN")
+    assert index.add(lead("Glam Salon"))[1]
+    assert index.add(lead("Glam Salon"))[1]
+    assert len(index.leads) == 2
+
+
+def test_find_does_not_index():
+    index = LeadIndex("IN")
+    assert index.find(lead("Glam Salon", place_id="abc")) is None
+    first, _ = index.add(lead("Glam Salon", place_id="abc"))
+    assert index.find(lead("Other", place_id="abc")) is first
+    assert index.duplicates == 0
+
+
+def test_merge_keeps_nearest_location_and_fills_gaps():
+    primary = lead("Glam Salon", distance_km=5.0, location="Pune", matched_industries=["salon"])
+    duplicate = lead(
+        "Glam Salon", phone="98765 43210", address="MG Road",
+        distance_km=2.0, location="Kothrud", matched_industries=["spa", "salon"]
+    )
+    merge_lead(primary, duplicate)
+    assert primary["distance_km"] == 2.0
+    assert primary["location"] == "Kothrud"
+    assert primary["phone"] == "98765 43210"
+    assert primary["address"] == "MG Road"
+    assert primary["matched_industries"] == ["salon", "spa"]
+
+
+def test_merge_keeps_existing_fields_and_nearer_primary():
+    primary = lead("Glam Salon", phone="11111 11111", distance_km=1.0, location="Pune")
+    merge_lead(primary, lead("Glam Salon", phone="22222 22222", distance_km=3.0, location="Kothrud", matched_industries=["spa"]))
+    assert primary["phone"] == "11111 11111"
+    assert primary["distance_km"] == 1.0
+    assert primary["location"] == "Pune"
+    assert primary["matched_industries"] == ["spa"]
+
+
+def test_index_add_merges_into_kept_lead():
+    index = LeadIndex("IN")
+    index.add(lead("Glam Salon", place_id="abc", distance_km=4.0, location="Pune", matched_industries=["salon"]))
+    kept, _ = index.add(lead("Glam Salon", place_id="abc", distance_km=1.5, location="Kothrud", matched_industries=["spa"]))
+    assert kept["distance_km"] == 1.5
+    assert kept["location"] == "Kothrud"
+    assert kept["matched_industries"] == ["salon", "spa"]
@@ -0,0 +1,51 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import pytest
+
+from phone_normalizer import normalize_phone, normalize_phones
+
+
+@pytest.mark.parametrize("phone, country, expected", [
+    # National numbers, with and without the trunk prefix
+    ("098765 43210", "IN", "919876543210"),
+    ("98765 43210", "IN", "919876543210"),
+    ("(415) 555-0123", "US", "14155550123"),
+    ("1 415 555 0123", "US", "14155550123"),
+    ("020 7946 0958", "GB", "442079460958"),
+    ("6123 4567", "SG", "6561234567"),
+    # Calling code without '+', and a trunk prefix written after it
+    ("91 98765 43210", "IN", "919876543210"),
+    ("91 098765 43210", "IN", "919876543210"),
+    # Already international, whatever the searched country
+    ("+44 20 7946 0958", "IN", "442079460958"),
+    ("0044 20 7946 0958", "IN", "442079460958"),
+    ("+81 3-1234-5678", "IN", "81312345678"),
+    # Countries without a full rule: trunk prefix replaced by the calling code
+    ("03-1234-5678", "JP", "81312345678"),
+    ("021-1234-5678", "ID", "622112345678"),
+    ("81 3-1234-5678", "JP", "81312345678"),
+])
+def test_normalize_phone(phone, country, expected):
+    assert normalize_phone(phone, country) == expected
+
+
+@pytest.mark.parametrize("phone, country", [
+    ("", "IN"),
+    ("12345", "IN"),
+    # Trunk prefix kept on a number of national length
+    ("0876543210", "IN"),
+    # National number in a country with no known calling code
+    ("03-1234-5678", "XX"),
+    # No calling code starts with 0
+    ("+0312345678", "JP"),
+    ("+1234567890123456", "US"),
+])
+def test_normalize_phone_rejects_invalid(phone, country):
+    assert normalize_phone(phone, country) is None
+
+
+def test_normalize_phones_keeps_order():
+    assert normalize_phones(["98765 43210", "bad", "98765 43210"], "in") == ["919876543210", None, "919876543210"]
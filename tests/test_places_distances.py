@@ -0,0 +1,105 @@
+import math
+import os
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+os.environ.setdefault("CACHE_DIR", tempfile.mkdtemp(prefix="places-test-"))
+
+import numpy as np
+import pytest
+
+from places_service import EARTH_RADIUS_KM, places_service
+
+
+def _destination(latitude, longitude, distance_km, bearing_deg):
+    """Point distance_km from (latitude, longitude) along bearing_deg on the haversine sphere."""
+    angular = distance_km / EARTH_RADIUS_KM
+    bearing = math.radians(bearing_deg)
+    lat1, lng1 = math.radians(latitude), math.radians(longitude)
+    lat2 = math.asin(math.sin(lat1) * math.cos(angular) + math.cos(lat1) * math.sin(angular) * math.cos(bearing))
+    lng2 = lng1 + math.atan2(
+        math.sin(bearing) * math.sin(angular) * math.cos(lat1),
+        math.cos(angular) - math.sin(lat1) * math.sin(lat2)
+    )
+    return math.degrees(lat2), (math.degrees(lng2) + 180.0) % 360.0 - 180.0
+
+
+def _scalar_distances(latitude, longitude, lats, lngs):
+    return [places_service.calculate_distance(latitude, longitude, lat, lng) for lat, lng in zip(lats, lngs)]
+
+
+def test_calculate_distances_matches_scalar_on_random_points():
+    rng = random.Random(7)
+    for _ in range(20):
+        latitude, longitude = rng.uniform(-85, 85), rng.uniform(-180, 180)
+        lats = [rng.uniform(-90, 90) for _ in range(500)]
+        lngs = [rng.uniform(-180, 180) for _ in range(500)]
+        nearby = [_destination(latitude, longitude, rng.uniform(0, 60), rng.uniform(0, 360)) for _ in range(500)]
+        lats += [lat for lat, _ in nearby]
+        lngs += [lng for _, lng in nearby]
+        vectorized = places_service.calculate_distances(latitude, longitude, np.array(lats), np.array(lngs))
+        assert vectorized.tolist() == _scalar_distances(latitude, longitude, lats, lngs)
+
+
+def _unrounded_km(lat1, lng1, lat2, lng2):
+    a = (math.sin(math.radians(lat2 - lat1) / 2) ** 2 +
+         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
+         math.sin(math.radians(lng2 - lng1) / 2) ** 2)
+    return EARTH_RADIUS_KM * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def test_calculate_distances_matches_scalar_on_rounding_boundaries():
+    # Along the equator one float step of longitude moves the distance by about
+    # one float step, so scanning steps around x.xx5 km finds distances where
+    # round() and np.round() disagree
+    lngs = []
+    for step in range(1, 400):
+        lng = math.degrees((step * 0.01 + 0.005) / EARTH_RADIUS_KM)
+        for _ in range(30):
+            lng = math.nextafter(lng, 0.0)
+        for _ in range(60):
+            km = _unrounded_km(0.0, 0.0, 0.0, lng)
+            if round(km, 2) != float(np.round(km, 2)):
+                lngs.append(lng)
+            lng = math.nextafter(lng, 1.0)
+    assert len(lngs) > 50
+    lats = [0.0] * len(lngs)
+    vectorized = places_service.calculate_distances(0.0, 0.0, np.array(lats), np.array(lngs))
+    assert vectorized.tolist() == _scalar_distances(0.0, 0.0, lats, lngs)
+
+
+def test_calculate_distances_empty():
+    assert places_service.calculate_distances(0.0, 0.0, np.array([]), np.array([])).size == 0
+
+
+@pytest.mark.parametrize("latitude, longitude", [
+    (0.0, 179.95),     # antimeridian
+    (-16.5, -179.99),  # antimeridian, southern hemisphere
+    (89.95, 0.0),      # circle covers the north pole
+    (-89.9, 120.0),    # circle covers the south pole
+    (78.0, 15.0),      # high latitude, wide longitude span
+])
+def test_bounding_box_mask_keeps_every_point_in_radius(latitude, longitude):
+    rng = random.Random(3)
+    radius_km = 30.0
+    points = [_destination(latitude, longitude, rng.uniform(0, 40), rng.uniform(0, 360)) for _ in range(5000)]
+    # Points whose rounded distance lands exactly on the radius
+    points += [_destination(latitude, longitude, radius_km + 0.004, bearing) for bearing in range(0, 360, 5)]
+    lats = np.array([lat for lat, _ in points])
+    lngs = np.array([lng for _, lng in points])
+
+    mask = places_service.bounding_box_mask(latitude, longitude, radius_km, lats, lngs)
+    distances = _scalar_distances(latitude, longitude, lats, lngs)
+    inside = [i for i, distance in enumerate(distances) if distance <= radius_km]
+    assert inside
+    assert all(mask[i] for i in inside)
+
+
+def test_bounding_box_mask_drops_far_points():
+    lats = np.array([0.0, 0.0, 1.0])
+    lngs = np.array([-179.98, 179.0, 179.95])
+    mask = places_service.bounding_box_mask(0.0, 179.95, 10.0, lats, lngs)
+    assert mask.tolist() == [True, False, False]
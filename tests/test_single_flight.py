@@ -0,0 +1,78 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import pytest
+
+from single_flight import SingleFlight, single_flight_stats
+
+
+def test_concurrent_calls_share_one_execution():
+    group = SingleFlight("test-shared")
+    runs = []
+
+    async def fetch():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return {"leads": 3}
+
+    async def main():
+        return await asyncio.gather(*(group.do("pune", fetch) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert len(runs) == 1
+    assert all(result is results[0] for result in results)
+    assert group.stats() == {"calls": 5, "executions": 1, "coalesced": 4, "in_flight": 0}
+    assert single_flight_stats()["test-shared"] == group.stats()
+
+
+def test_different_keys_run_separately():
+    group = SingleFlight("test-keys")
+
+    async def main():
+        async def fetch(value):
+            await asyncio.sleep(0.01)
+            return value
+        return await asyncio.gather(group.do("a", lambda: fetch("a")), group.do("b", lambda: fetch("b")))
+
+    assert asyncio.run(main()) == ["a", "b"]
+    assert group.stats()["executions"] == 2
+
+
+def test_errors_reach_every_caller_and_free_the_key():
+    group = SingleFlight("test-errors")
+    runs = []
+
+    async def fail():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream down")
+
+    async def main():
+        results = await asyncio.gather(group.do("k", fail), group.do("k", fail), return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        assert group.stats()["in_flight"] == 0
+        with pytest.raises(ValueError):
+            await group.do("k", fail)
+
+    asyncio.run(main())
+    assert len(runs) == 2
+
+
+def test_cancelled_caller_does_not_cancel_shared_call():
+    group = SingleFlight("test-cancel")
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def main():
+        first = asyncio.ensure_future(group.do("k", fetch))
+        second = asyncio.ensure_future(group.do("k", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "done"